@@ -1,11 +1,26 @@
+import argparse
+import os
 import random
-import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game_dataset import NUM_BOARD_CARDS, GameDatasetWriter, card_columns, is_game_dataset
+from hand_evaluator import NUM_CARDS, int_to_card
 
 # 定義撲克牌
 suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
 ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
 deck = [rank + ' of ' + suit for suit in suits for rank in ranks]
 
+positions = ['Button', 'Small Blind', 'Big Blind', 'UTG', 'HighJack', 'CutOff']
+
+# 每個批次（也是每個子種子）的局數，固定後結果與 worker 數無關
+GAME_CHUNK_SIZE = 100000
+CARD_NAMES = np.array([int_to_card(code) for code in range(NUM_CARDS)])
+
+
 def deal_poker_hands(deck, num_players=6):
     # 複製一副新的牌堆
     current_deck = deck[:]
@@ -34,31 +49,95 @@ def deal_poker_hands(deck, num_players=6):
 
     return hands, community_cards
 
-# 記錄100萬局
-num_games = 100000
-results = []
 
-positions = ['Button', 'Small Blind', 'Big Blind', 'UTG', 'HighJack', 'CutOff']
+def seat_names(num_players):
+    if num_players <= len(positions):
+        return positions[:num_players]
+    return positions + [f'Seat {i+1}' for i in range(len(positions), num_players)]
+
+
+def deal_batch(rng, num_games, num_players=6):
+    # 每列對隨機矩陣做 argsort 即為一副洗好的牌，取前 2 * 玩家數 + 5 張
+    shuffled = np.argsort(rng.random((num_games, NUM_CARDS)), axis=1)
+    return shuffled[:, :2 * num_players + NUM_BOARD_CARDS].astype(np.uint8)
+
+
+def _deal_chunk(entropy, chunk_index, num_games, num_players):
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(chunk_index,)))
+    return deal_batch(rng, num_games, num_players)
+
+
+def generate_games(n, seed=None, num_players=6, workers=1, chunk_size=GAME_CHUNK_SIZE):
+    # 依序產生 (局數, 2 * 玩家數 + 5) 的牌編碼批次；每批有獨立的子種子
+    entropy = np.random.SeedSequence(seed).entropy
+    chunks = [(entropy, index, min(chunk_size, n - start), num_players)
+              for index, start in enumerate(range(0, n, chunk_size))]
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield _deal_chunk(*chunk)
+        return
+
+    # 限制同時進行的批次數量，避免結果在記憶體中堆積
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_deal_chunk, *chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_games_csv(path, chunks, num_players=6):
+    import pandas as pd
+
+    columns = card_columns(seat_names(num_players))
+    num_games = 0
+    for cards in chunks:
+        df = pd.DataFrame(CARD_NAMES[cards], columns=columns)
+        df.insert(0, 'Game Number', np.arange(num_games + 1, num_games + len(cards) + 1))
+        df.to_csv(path, mode='w' if num_games == 0 else 'a', header=num_games == 0, index=False)
+        num_games += len(cards)
+    return num_games
+
+
+def write_games_binary(path, chunks, num_players=6, append=False):
+    with GameDatasetWriter(path, seat_names(num_players), append) as writer:
+        for cards in chunks:
+            writer.write(cards)
+    return writer.num_games
 
-for game_number in range(num_games):
-    hands, community_cards = deal_poker_hands(deck)
 
-    game_result = {'Game Number': game_number + 1}
+def save_games(path, n, seed=None, num_players=6, workers=1, chunk_size=GAME_CHUNK_SIZE, append=False):
+    # append 只支援二進位格式，回傳寫入後檔案中的總局數
+    if path.endswith('.csv'):
+        if append:
+            raise ValueError("Appending is only supported for the binary game dataset format")
+        return write_games_csv(path, generate_games(n, seed, num_players, workers, chunk_size), num_players)
+    return write_games_binary(path, generate_games(n, seed, num_players, workers, chunk_size), num_players, append)
 
-    for i, position in enumerate(positions):
-        game_result[f'{position} Hand 1'] = hands[f'Player {i+1}'][0]
-        game_result[f'{position} Hand 2'] = hands[f'Player {i+1}'][1]
 
-    for j in range(5):
-        game_result[f'Community Card {j+1}'] = community_cards[j]
+def main():
+    parser = argparse.ArgumentParser(description="Deal random Texas Hold'em games and save them to disk.")
+    parser.add_argument('--num-games', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--num-players', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', default='Texas_Holdem/poker_games_detailed2.csv',
+                        help="CSV path, or any other extension for the binary game dataset format")
+    parser.add_argument('--append', action='store_true', help="Add the games to an existing binary game dataset")
+    args = parser.parse_args()
 
-    results.append(game_result)
+    num_games = save_games(args.output, args.num_games, args.seed, args.num_players, args.workers, append=args.append)
+    print(f"{args.output} now holds {num_games} games")
 
-# 將結果轉為DataFrame
-df = pd.DataFrame(results)
+    # 顯示前幾局結果
+    if not is_game_dataset(args.output):
+        with open(args.output) as f:
+            for _ in range(6):
+                print(f.readline().rstrip())
 
-# 顯示前幾局結果
-print(df.head())
 
-# 將結果保存到CSV文件
-df.to_csv('Texas_Holdem/poker_games_detailed2.csv', index=False)
+if __name__ == '__main__':
+    main()
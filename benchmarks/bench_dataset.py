@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_dataset import DEFAULT_SEATS, GameDataset, card_columns, decode_card_columns, write_games
+from hand_evaluator import int_to_card
+
+
+def random_games(num_games, num_players=6, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.argsort(rng.random((num_games, 52)), axis=1)[:, :2 * num_players + 5].astype(np.uint8)
+
+
+def main(num_games=200_000):
+    cards = random_games(num_games)
+    columns = card_columns(DEFAULT_SEATS)
+    names = np.array([int_to_card(code) for code in range(52)])
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'games.csv')
+        binary_path = os.path.join(directory, 'games.thgd')
+        pd.DataFrame(names[cards], columns=columns).to_csv(csv_path, index=False)
+        write_games(binary_path, cards)
+
+        start = time.perf_counter()
+        csv_cards = decode_card_columns(pd.read_csv(csv_path), columns)
+        csv_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dataset = GameDataset(binary_path)
+        binary_cards = np.array(dataset.cards)
+        binary_time = time.perf_counter() - start
+        assert np.array_equal(csv_cards, binary_cards)
+
+        start = time.perf_counter()
+        GameDataset(binary_path).cards[num_games // 2:num_games // 2 + 1000].sum()
+        slice_time = time.perf_counter() - start
+
+        print(f"games:              {num_games:>12,}")
+        print(f"CSV size:           {os.path.getsize(csv_path) / 1e6:>12.1f} MB")
+        print(f"binary size:        {os.path.getsize(binary_path) / 1e6:>12.1f} MB")
+        print(f"CSV load + decode:  {csv_time:>12.3f} s")
+        print(f"binary full load:   {binary_time:>12.3f} s")
+        print(f"binary 1k slice:    {slice_time * 1000:>12.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
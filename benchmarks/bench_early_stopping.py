@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy_optimizer import NUM_GENERATIONS, POSITIONS, StrategyOptimizer
+
+
+def run(optimizer, **settings):
+    # 以不同的執行控制設定訓練同一份已 ingest 的資料
+    optimizer = optimizer.with_config(optimizer.config.replace(**settings))
+    start = time.perf_counter()
+    results = {position: optimizer.optimize_position(position) for position in POSITIONS}
+    return results, time.perf_counter() - start
+
+
+def main(data_path):
+    optimizer = StrategyOptimizer(data_path, seed=0)
+    fixed, fixed_time = run(optimizer, elite_count=0, early_stopping_patience=0, min_diversity=0)
+    controlled, controlled_time = run(optimizer)
+
+    print(f"{'position':<12} {'fixed fitness':>14} {'controlled fitness':>19} {'generations':>12} {'stop reason':>16}")
+    for position in POSITIONS:
+        _, fixed_fitness, _ = fixed[position]
+        _, fitness, info = controlled[position]
+        print(f"{position:<12} {fixed_fitness:>14.2f} {fitness:>19.2f} {info['generations']:>5}/{NUM_GENERATIONS:<6} {info['stop_reason']:>16}")
+    print(f"fixed {NUM_GENERATIONS} generations: {fixed_time:.2f} s, early stopping + elitism: {controlled_time:.2f} s")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'Texas_Holdem/poker_games_detailed2.csv')
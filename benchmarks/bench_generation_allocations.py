@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_genetic_algorithm import legacy_breed, legacy_evaluate_fitness
+from strategy_optimizer import (CROSSOVER_RATE, INITIAL_POPULATION_SIZE, MUTATION_RATE, POSITIONS,
+                                StrategyOptimizer, genome_to_strategy)
+
+STAGES = ['fitness', 'selection', 'crossover', 'mutation', 'breeding']
+
+
+def untraced(name, function, *args):
+    return function(*args)
+
+
+class StageTracer:
+    # 分別記錄每個步驟的記憶體配置峰值，適應度評估的暫存陣列不會掩蓋世代更新本身的配置
+    def __init__(self):
+        self.peaks = {}
+
+    def __call__(self, name, function, *args):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = function(*args)
+        self.peaks.setdefault(name, []).append(tracemalloc.get_traced_memory()[1] - baseline)
+        return result
+
+    def average(self, name):
+        peaks = self.peaks.get(name)
+        return sum(peaks) / len(peaks) if peaks else None
+
+
+def measure(step, state, generations):
+    # 先量測時間（不啟用 tracemalloc），再量測每個步驟的記憶體配置峰值
+    start = time.perf_counter()
+    for _ in range(generations):
+        state = step(state, untraced)
+    wall = (time.perf_counter() - start) / generations
+
+    tracer = StageTracer()
+    tracemalloc.start()
+    for _ in range(generations):
+        state = step(state, tracer)
+    tracemalloc.stop()
+    return wall, tracer
+
+
+def main(data_path, generations=50):
+    optimizer = StrategyOptimizer(data_path, seed=0)
+    position = POSITIONS[0]
+    factors = optimizer.fitness_factors_by_position[position]
+    rng = optimizer.position_rng(position)
+    population = optimizer.initialize_population_for_position(position, INITIAL_POPULATION_SIZE, rng)
+
+    def legacy_step(individuals, trace):
+        fitness_scores = trace('fitness', lambda: [legacy_evaluate_fitness(optimizer, individual, position) for individual in individuals])
+        return trace('breeding', legacy_breed, individuals, fitness_scores)
+
+    def array_step(buffers):
+        def step(current, trace):
+            fitness_scores = trace('fitness', optimizer.evaluate_population_fitness, current, factors)
+            # 量測記憶體時先逐一量測選擇、交叉與突變（結果捨棄），再量測 create_new_population_for_position 整體
+            # 兩者寫入同一組緩衝區，不會改寫正在讀取的 current
+            out = buffers.next() if buffers else None
+            if trace is not untraced:
+                new_population, _ = trace('selection', optimizer.select_new_population, current, fitness_scores, rng, None, out)
+                trace('crossover', optimizer.crossover_children, new_population, CROSSOVER_RATE, rng, None, buffers)
+                trace('mutation', optimizer.mutate, new_population, MUTATION_RATE, rng, None,
+                      buffers.random if buffers else None, buffers.mutation_mask if buffers else None)
+            return trace('breeding', optimizer.create_new_population_for_position, current, position, fitness_scores, MUTATION_RATE,
+                         CROSSOVER_RATE, rng, None, out)[0]
+        return step
+
+    legacy_population = [genome_to_strategy(genome, position) for genome in population]
+    results = [
+        ('legacy dict genomes', measure(legacy_step, legacy_population, generations)),
+        ('array, new arrays', measure(array_step(None), population.copy(), generations)),
+        ('array, reused buffers', measure(array_step(optimizer.generation_buffers(INITIAL_POPULATION_SIZE)), population.copy(), generations)),
+    ]
+    print(f"population: {population.nbytes / 1024:.1f} KiB; peak KiB allocated per step, averaged over {generations} generations")
+    print(f"{'':<24} {'ms/gen':>8}" + ''.join(f" {stage:>10}" for stage in STAGES))
+    for name, (wall, tracer) in results:
+        peaks = [tracer.average(stage) for stage in STAGES]
+        print(f"{name:<24} {wall * 1000:>8.3f}" + ''.join(f" {'-' if peak is None else f'{peak / 1024:.1f}':>10}" for peak in peaks))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'Texas_Holdem/poker_games_detailed2.csv')
@@ -0,0 +1,65 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy_optimizer import (ACTIONS, CROSSOVER_RATE, GENES_PER_INDIVIDUAL, INITIAL_POPULATION_SIZE,
+                                MUTATION_RATE, NUM_GENERATIONS, POSITIONS, StrategyOptimizer, genome_to_strategy)
+
+
+# 舊版以 dict 基因逐一迴圈的世代更新，只用於比較
+def legacy_generation(optimizer, population, position):
+    fitness_scores = [legacy_evaluate_fitness(optimizer, individual, position) for individual in population]
+    return legacy_breed(population, fitness_scores)
+
+
+def legacy_breed(population, fitness_scores):
+    # 選擇、交叉與突變；突變直接改寫被選中的 dict 基因
+    parents = random.choices(population, weights=fitness_scores, k=len(population) // 2 * 2)
+    new_population = []
+    for i in range(0, len(parents), 2):
+        child1, child2 = parents[i], parents[i + 1]
+        if random.random() < CROSSOVER_RATE and random.random() <= CROSSOVER_RATE:
+            point1, point2 = sorted(random.sample(range(GENES_PER_INDIVIDUAL), 2))
+            child1, child2 = (child1[:point1] + child2[point1:point2] + child1[point2:],
+                              child2[:point1] + child1[point1:point2] + child2[point2:])
+        for child in (child1, child2):
+            for gene in child:
+                if random.random() < MUTATION_RATE:
+                    gene['action'] = random.choice(ACTIONS)
+            new_population.append(child)
+    return new_population
+
+
+def legacy_evaluate_fitness(optimizer, strategy, position):
+    # 舊版 evaluate_fitness_for_position 逐一累加每個 dict 基因
+    factors = optimizer.fitness_factors_by_position[position]
+    return sum(factors[ACTIONS.index(gene['action']), gene['hand_value']] for gene in strategy)
+
+
+def main(data_path, legacy_generations=20):
+    optimizer = StrategyOptimizer(data_path, seed=0)
+    position = POSITIONS[0]
+    rng = optimizer.position_rng(position)
+    population = [genome_to_strategy(genome, position)
+                  for genome in optimizer.initialize_population_for_position(position, INITIAL_POPULATION_SIZE, rng)]
+
+    start = time.perf_counter()
+    for _ in range(legacy_generations):
+        population = legacy_generation(optimizer, population, position)
+    legacy_per_generation = (time.perf_counter() - start) / legacy_generations
+
+    start = time.perf_counter()
+    _, _, info = optimizer.optimize_position(position)
+    vectorized_per_generation = (time.perf_counter() - start) / info['generations']
+
+    full_run = len(POSITIONS) * NUM_GENERATIONS
+    print(f"legacy generation:      {legacy_per_generation * 1000:>10.3f} ms  (full run ~{legacy_per_generation * full_run:,.1f} s)")
+    print(f"vectorized generation:  {vectorized_per_generation * 1000:>10.3f} ms  (full run ~{vectorized_per_generation * full_run:,.1f} s)")
+    print(f"speedup:                {legacy_per_generation / vectorized_per_generation:>10.1f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'Texas_Holdem/poker_games_detailed2.csv')
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_evaluator import evaluate, evaluate_batch, int_to_card
+
+
+# 舊版 StrategyOptimizer.calculate_hand_value 的原始實作，只用於比較
+def legacy_calculate_hand_value(cards):
+    ranks = '23456789TJQKA'
+    suits = 'CDHS'
+
+    def card_value(card):
+        rank, suit = card.split(' of ')
+        suit = suit[0]
+        if rank == '10':
+            rank = 'T'
+        return ranks.index(rank), suits.index(suit)
+
+    values = sorted([card_value(card) for card in cards], reverse=True)
+    hand_ranks = [value[0] for value in values]
+    hand_suits = [value[1] for value in values]
+
+    is_flush = len(set(hand_suits)) == 1
+    is_straight = all(hand_ranks[i] - hand_ranks[i+1] == 1 for i in range(len(hand_ranks) - 1))
+    rank_counts = {rank: hand_ranks.count(rank) for rank in set(hand_ranks)}
+    if is_flush and is_straight:
+        return 8
+    elif 4 in rank_counts.values():
+        return 7
+    elif 3 in rank_counts.values() and 2 in rank_counts.values():
+        return 6
+    elif is_flush:
+        return 5
+    elif is_straight:
+        return 4
+    elif 3 in rank_counts.values():
+        return 3
+    elif list(rank_counts.values()).count(2) == 2:
+        return 2
+    elif 2 in rank_counts.values():
+        return 1
+    else:
+        return 0
+
+
+def random_hands(num_hands, num_cards=7, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.argsort(rng.random((num_hands, 52)), axis=1)[:, :num_cards].astype(np.int8)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(num_hands=1_000_000, num_scalar=100_000):
+    hands = random_hands(num_hands)
+    scalar_hands = hands[:num_scalar].tolist()
+    string_hands = [[int_to_card(card) for card in hand] for hand in scalar_hands]
+
+    legacy = timed(lambda: [legacy_calculate_hand_value(hand) for hand in string_hands])
+    scalar = timed(lambda: [evaluate(hand) for hand in scalar_hands])
+    evaluate_batch(hands[:1000])
+    batch = timed(evaluate_batch, hands)
+
+    print(f"legacy calculate_hand_value: {num_scalar / legacy:>12,.0f} hands/s")
+    print(f"evaluate (scalar):           {num_scalar / scalar:>12,.0f} hands/s")
+    print(f"evaluate_batch:              {num_hands / batch:>12,.0f} hands/s")
+
+
+if __name__ == '__main__':
+    main()
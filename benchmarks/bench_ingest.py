@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy_optimizer import StrategyOptimizer
+
+
+def main(data_path, chunk_sizes=(16384, 65536, 262144), append_size=1000):
+    for chunk_size in chunk_sizes:
+        optimizer = StrategyOptimizer(seed=0)
+        tracemalloc.start()
+        start = time.perf_counter()
+        num_games = optimizer.ingest_file(data_path, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"ingest_file chunk {chunk_size:>7}: {num_games / elapsed:>12,.0f} games/s  {peak / 2**20:>8.1f} MiB peak")
+
+    # 附加少量牌局時只處理新的牌局，期望值與適應度表格由累計量重算
+    cards = next(optimizer.iter_card_chunks(data_path, append_size))
+    start = time.perf_counter()
+    for _ in range(20):
+        optimizer.ingest(cards)
+    print(f"ingest {append_size} appended games: {(time.perf_counter() - start) / 20 * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'Texas_Holdem/poker_games_detailed2.csv')
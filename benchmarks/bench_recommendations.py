@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_evaluator import int_to_card
+from strategy_optimizer import POSITIONS
+from strategy_store import load_or_train
+
+
+def random_situations(num_situations, seed=0):
+    rng = np.random.default_rng(seed)
+    cards = np.argsort(rng.random((num_situations, 52)), axis=1)[:, :7].astype(np.int8)
+    num_community_cards = rng.choice([0, 3, 4, 5], size=num_situations)
+    cards[np.arange(7) >= 2 + num_community_cards[:, None]] = -1
+    positions = rng.integers(len(POSITIONS), size=num_situations)
+    remaining_funds = rng.choice([15, 20, 100, 1000], size=num_situations)
+    pot_sizes = rng.choice([30, 60, 200], size=num_situations)
+    return positions, cards, remaining_funds, pot_sizes
+
+
+def main(data_path, num_scalar=20_000, num_batch=1_000_000):
+    optimizer = load_or_train(data_path, seed=0)
+
+    positions, cards, remaining_funds, pot_sizes = random_situations(num_scalar)
+    calls = [
+        (POSITIONS[position], [int_to_card(card) for card in row[:2]], [int_to_card(card) for card in row[2:] if card >= 0],
+         1000, remaining, pot)
+        for position, row, remaining, pot in zip(positions, cards, remaining_funds, pot_sizes)
+    ]
+    start = time.perf_counter()
+    for call in calls:
+        optimizer.recommend_action(*call)
+    scalar = time.perf_counter() - start
+
+    batch_situations = random_situations(num_batch, seed=1)
+    start = time.perf_counter()
+    optimizer.recommend_actions(*batch_situations)
+    batch = time.perf_counter() - start
+
+    print(f"recommend_action:   {num_scalar / scalar:>14,.0f} recommendations/s")
+    print(f"recommend_actions:  {num_batch / batch:>14,.0f} recommendations/s")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'Texas_Holdem/poker_games_detailed2.csv')
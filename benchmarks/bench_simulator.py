@@ -0,0 +1,21 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator import simulate
+from strategy_store import load_or_train
+
+
+def main(data_path, num_hands=200_000):
+    table = load_or_train(data_path, seed=0).decision_table
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        simulate(table, num_hands, seed=0, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"workers {workers:>3}: {num_hands / elapsed * 60:>14,.0f} hands/min")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'Texas_Holdem/poker_games_detailed2.csv')
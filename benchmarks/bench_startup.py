@@ -0,0 +1,92 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 啟動預算（毫秒）：GUI 模組本身的匯入時間，以及新的直譯器載入已訓練策略並完成第一次推薦的總時間
+GUI_IMPORT_BUDGET_MS = 150
+FIRST_RECOMMENDATION_BUDGET_MS = 600
+# 介面與推薦路徑不應該載入的訓練、資料讀取模組
+TRAINING_MODULES = [
+    'pandas', 'Licensing', 'strategy_optimizer', 'game_dataset', 'fitness_cache', 'run_controller', 'profiling',
+    'multiprocessing', 'concurrent.futures',
+]
+
+FIRST_RECOMMENDATION = '''
+import sys
+from strategy_store import load_strategy
+policy = load_strategy(sys.argv[1])
+policy.recommend_action('Button', ['A of Spades', 'K of Spades'], [], 1000, 1000, 30)
+'''
+
+
+def import_times(code, *args):
+    # 以 -X importtime 在新的直譯器中執行 code，回傳 ({模組: 累計微秒}, 行程總秒數)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code, *args], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times, elapsed
+
+
+def best_run(code, *args, repeat=5):
+    # 取最快的一次，排除磁碟快取與排程的干擾
+    return min((import_times(code, *args) for _ in range(repeat)), key=lambda run: run[1])
+
+
+def build_artifact(directory, num_games=20000, num_generations=20):
+    from Licensing import save_games
+    from strategy_config import StrategyConfig
+    from strategy_optimizer import StrategyOptimizer
+    from strategy_store import save_strategy
+
+    data_path = os.path.join(directory, 'games.csv')
+    save_games(data_path, num_games, seed=0)
+    optimizer = StrategyOptimizer(data_path, seed=0, config=StrategyConfig(num_generations=num_generations))
+    optimizer.optimize_strategy()
+    path = os.path.join(directory, 'strategy.npz')
+    save_strategy(optimizer, path)
+    return path
+
+
+def report(name, times, budget_ms, value_ms, top=8):
+    print(f"{name}: {value_ms:.1f} ms (budget {budget_ms} ms)")
+    for module, cumulative in sorted(times.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+    loaded = [module for module in TRAINING_MODULES if module in times]
+    if loaded:
+        print(f"  unexpected imports: {', '.join(loaded)}")
+    return value_ms <= budget_ms and not loaded
+
+
+def main(artifact=None, repeat=5):
+    gui_times, _ = best_run('import main_gui', repeat=repeat)
+    passed = report('import main_gui', gui_times, GUI_IMPORT_BUDGET_MS, gui_times['main_gui'] / 1000)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if artifact is None:
+            artifact = build_artifact(directory)
+        times, elapsed = best_run(FIRST_RECOMMENDATION, artifact, repeat=repeat)
+    passed &= report('load artifact + first recommendation', times, FIRST_RECOMMENDATION_BUDGET_MS, elapsed * 1000)
+
+    print('PASS' if passed else 'FAIL')
+    return passed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check GUI and inference startup time against a budget with python -X importtime.")
+    parser.add_argument('--artifact', help="Trained strategy artifact; a small one is trained on synthetic games when omitted")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(0 if main(args.artifact, args.repeat) else 1)
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_recommendations import random_situations
+from hand_evaluator import int_to_card
+from recommendation_server import DEFAULT_HOST, DEFAULT_PORT
+from strategy_optimizer import POSITIONS
+
+
+def request_bodies(num_requests, seed=0):
+    positions, cards, remaining_funds, pot_sizes = random_situations(num_requests, seed)
+    return [
+        json.dumps({
+            'position': POSITIONS[position],
+            'hand': [int_to_card(card) for card in row[:2]],
+            'community_cards': [int_to_card(card) for card in row[2:] if card >= 0],
+            'remaining_funds': int(remaining),
+            'pot_size': int(pot),
+        }).encode('utf-8')
+        for position, row, remaining, pot in zip(positions, cards, remaining_funds, pot_sizes)
+    ]
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def http_request(reader, writer, method, path, body=b''):
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(args, bodies, latencies, errors):
+    # 每個客戶端使用一條 keep-alive 連線依序送出請求
+    reader, writer = await open_connection(args)
+    for body in bodies:
+        start = time.perf_counter()
+        status, _ = await http_request(reader, writer, 'POST', '/recommend', body)
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+    writer.close()
+
+
+async def run(args):
+    bodies = request_bodies(args.requests)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args, bodies[i::args.concurrency], latencies, errors) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await open_connection(args)
+    _, metrics = await http_request(reader, writer, 'GET', '/metrics')
+    writer.close()
+
+    p50, p90, p99 = np.percentile(np.array(latencies) * 1000, [50, 90, 99])
+    print(f"{len(latencies)} requests from {args.concurrency} clients in {elapsed:.2f} s: {len(latencies) / elapsed:,.0f} requests/s, {len(errors)} errors")
+    print(f"client latency:  p50 {p50:.2f} ms  p90 {p90:.2f} ms  p99 {p99:.2f} ms")
+    print(f"server metrics:  {json.dumps(metrics)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a running recommendation_server.py.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=20000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_recommendations import random_situations
+from hand_evaluator import int_to_card
+from Licensing import save_games
+from profiling import StageTimer
+from strategy_optimizer import POSITIONS, StrategyOptimizer
+
+DATASET_SIZES = [1_000, 100_000, 1_000_000]
+DATASET_SEED = 0
+# 完整 optimize_strategy 使用縮小的設定，讓各資料集大小都能在合理時間內跑完
+REDUCED_GENERATIONS = 50
+NUM_HAND_VALUE_CALLS = 20_000
+NUM_GA_GENERATIONS = 50
+NUM_SCALAR_RECOMMENDATIONS = 20_000
+NUM_BATCH_RECOMMENDATIONS = 100_000
+
+
+def dataset_path(data_dir, num_games):
+    # 合成資料集以固定種子產生，存在 data_dir 中重複使用
+    path = os.path.join(data_dir, f'synthetic-{num_games}-seed{DATASET_SEED}.thgd')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        save_games(path, num_games, seed=DATASET_SEED)
+    return path
+
+
+def measure(function, repeat=1):
+    # 回傳最短的執行時間（秒）與最後一次的回傳值
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def result(name, num_games, seconds, items=None, unit=None):
+    entry = {'name': name, 'games': num_games, 'seconds': seconds}
+    if items:
+        entry['items'] = items
+        entry['per_second'] = items / seconds
+        entry['unit'] = unit
+    return entry
+
+
+def bench_calculate_hand_value(optimizer, num_games, repeat):
+    rng = np.random.default_rng(0)
+    hands = [[int_to_card(card) for card in row] for row in np.argsort(rng.random((NUM_HAND_VALUE_CALLS, 52)), axis=1)[:, :7]]
+    seconds, _ = measure(lambda: [optimizer.calculate_hand_value(hand) for hand in hands], repeat)
+    return result('calculate_hand_value', num_games, seconds, len(hands), 'hands')
+
+
+def bench_ingest(path, num_games, repeat, timer):
+    # 取代舊的 create_historical_data：解碼、評估牌型並累加統計量
+    seconds, optimizer = measure(lambda: StrategyOptimizer(path, seed=0, stage_timer=timer), repeat)
+    optimizer.stage_timer = None
+    return result('ingest', num_games, seconds, num_games, 'games'), optimizer
+
+
+def bench_expected_values(optimizer, num_games, repeat):
+    seconds, _ = measure(optimizer.calculate_expected_values, repeat)
+    return result('calculate_expected_values', num_games, seconds)
+
+
+def bench_ga_generation(optimizer, num_games, repeat):
+    position = POSITIONS[0]
+    factors = optimizer.fitness_factors_by_position[position]
+    rng = optimizer.position_rng(position)
+    config = optimizer.config
+    population = optimizer.initialize_population_for_position(position, config.initial_population_size, rng)
+    buffers = optimizer.generation_buffers(config.initial_population_size)
+
+    def generations():
+        nonlocal population
+        for _ in range(NUM_GA_GENERATIONS):
+            fitness_scores = optimizer.evaluate_population_fitness(population, factors)
+            population, _ = optimizer.create_new_population_for_position(population, position, fitness_scores, config.mutation_rate,
+                                                                         config.crossover_rate, rng, out=buffers.next())
+
+    seconds, _ = measure(generations, repeat)
+    return result('ga_generation', num_games, seconds / NUM_GA_GENERATIONS, 1, 'generations')
+
+
+def bench_optimize_strategy(optimizer, num_games, repeat, timer):
+    optimizer = optimizer.with_config(optimizer.config.replace(num_generations=REDUCED_GENERATIONS))
+    optimizer.stage_timer = timer
+    seconds, _ = measure(optimizer.optimize_strategy, repeat)
+    entry = result('optimize_strategy', num_games, seconds)
+    entry['num_generations'] = REDUCED_GENERATIONS
+    optimizer.stage_timer = None
+    return entry, optimizer
+
+
+def bench_recommendations(optimizer, num_games, repeat):
+    positions, cards, remaining_funds, pot_sizes = random_situations(NUM_SCALAR_RECOMMENDATIONS)
+    calls = [
+        (POSITIONS[position], [int_to_card(card) for card in row[:2]], [int_to_card(card) for card in row[2:] if card >= 0], 1000, remaining, pot)
+        for position, row, remaining, pot in zip(positions, cards, remaining_funds, pot_sizes)
+    ]
+    scalar, _ = measure(lambda: [optimizer.recommend_action(*call) for call in calls], repeat)
+    situations = random_situations(NUM_BATCH_RECOMMENDATIONS, seed=1)
+    batch, _ = measure(lambda: optimizer.recommend_actions(*situations), repeat)
+    return [
+        result('recommend_action', num_games, scalar, len(calls), 'recommendations'),
+        result('recommend_actions', num_games, batch, NUM_BATCH_RECOMMENDATIONS, 'recommendations'),
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, data_dir, repeat=1, profile=False):
+    results = []
+    stages = {}
+    profiles = {}
+    for num_games in sizes:
+        path = dataset_path(data_dir, num_games)
+        print(f"Benchmarking {num_games:,} games", file=sys.stderr)
+        timer = StageTimer(profile)
+        entry, optimizer = bench_ingest(path, num_games, repeat, timer)
+        results.append(entry)
+        results.append(bench_calculate_hand_value(optimizer, num_games, repeat))
+        results.append(bench_expected_values(optimizer, num_games, repeat))
+        results.append(bench_ga_generation(optimizer, num_games, repeat))
+        # 之後的推薦測試使用縮小設定訓練出的策略
+        entry, optimizer = bench_optimize_strategy(optimizer, num_games, repeat, timer)
+        results.append(entry)
+        results.extend(bench_recommendations(optimizer, num_games, repeat))
+        stages[str(num_games)] = timer.totals()
+        if profile:
+            profiles[str(num_games)] = timer.profile_rows()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+        },
+        'results': results,
+        'stages': stages,
+    }
+    if profile:
+        report['profile'] = profiles
+    return report
+
+
+def compare(report, baseline):
+    # 依 (名稱, 局數) 對照兩次執行，比值 > 1 表示比基準慢
+    baseline_seconds = {(entry['name'], entry['games']): entry['seconds'] for entry in baseline['results']}
+    for entry in report['results']:
+        key = (entry['name'], entry['games'])
+        if key in baseline_seconds:
+            ratio = entry['seconds'] / baseline_seconds[key]
+            print(f"{entry['name']:<28} {entry['games']:>10,} games  {entry['seconds'] * 1000:>12.3f} ms  {ratio:>6.2f}x baseline", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the optimizer pipeline benchmarks and write the results as JSON.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DATASET_SIZES)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'poker-benchmark-data'))
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--profile', action='store_true', help="Also record cProfile statistics for the timed stages")
+    parser.add_argument('--output', help="JSON output path (default: stdout)")
+    parser.add_argument('--compare', help="Baseline JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    # 訓練過程的訊息改印到 stderr，stdout 只留 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run(args.sizes, args.data_dir, args.repeat, args.profile)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
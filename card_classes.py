@@ -0,0 +1,257 @@
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+
+from equity import board_equities, remaining_deck, sample_boards
+from hand_evaluator import CATEGORY_NAMES, NUM_CARDS, RANKS, encode_cards, evaluate_batch, hand_category
+
+# 花色互換下牌力不變：起手牌只有 169 類，手牌加翻牌只有 1,286,792 類
+NUM_RANKS = 13
+NUM_PREFLOP_CLASSES = NUM_RANKS * NUM_RANKS
+NUM_FLOP_CLASSES = 1286792
+NUM_CATEGORIES = len(CATEGORY_NAMES)
+SUIT_PERMUTATIONS = np.array(list(itertools.permutations(range(4))), dtype=np.int64)
+
+CARD_CLASS_TABLES_PATH = os.path.join('strategy_cache', 'card-classes.npz')
+# 表格內容或抽樣方式變動時遞增，讓舊檔案失效
+CARD_CLASS_TABLES_VERSION = 1
+CARD_CLASS_SEED = 0
+# 翻牌前勝率對 1..MAX_OPPONENTS 個隨機對手，各以 PREFLOP_EQUITY_SAMPLES 次模擬估計
+MAX_OPPONENTS = 5
+PREFLOP_EQUITY_SAMPLES = 10000
+# 每個翻牌類別抽樣的轉牌、河牌組合數，計數以 uint8 儲存
+FLOP_RUNOUT_SAMPLES = 64
+FLOP_CHUNK_SIZE = 4096
+
+# 起手牌類別的 13x13 格：列為較大的 rank、欄為較小的 rank 時為同花，反之為不同花，對角線為對子
+_CLASS_ROWS, _CLASS_COLUMNS = np.divmod(np.arange(NUM_PREFLOP_CLASSES), NUM_RANKS)
+PREFLOP_CATEGORIES = np.where(_CLASS_ROWS == _CLASS_COLUMNS, CATEGORY_NAMES.index('One Pair'), 0).astype(np.int8)
+_PREFLOP_CATEGORIES_LIST = PREFLOP_CATEGORIES.tolist()
+
+
+def preflop_classes(holes):
+    # holes: (..., 2) 牌編碼 → 起手牌類別索引
+    holes = np.asarray(holes, dtype=np.intp)
+    ranks = holes >> 2
+    high = ranks.max(axis=-1)
+    low = ranks.min(axis=-1)
+    suited = (holes[..., 0] & 3) == (holes[..., 1] & 3)
+    return np.where(suited, high * NUM_RANKS + low, low * NUM_RANKS + high)
+
+
+def preflop_class_one(card1, card2):
+    # 單筆查詢的純 Python 版本
+    high, low = max(card1 >> 2, card2 >> 2), min(card1 >> 2, card2 >> 2)
+    if (card1 & 3) == (card2 & 3):
+        return high * NUM_RANKS + low
+    return low * NUM_RANKS + high
+
+
+def preflop_categories(holes):
+    # 兩張手牌的牌型類別只有對子或高牌，直接查表而不評估
+    return PREFLOP_CATEGORIES[preflop_classes(holes)]
+
+
+def preflop_category_one(card1, card2):
+    return _PREFLOP_CATEGORIES_LIST[preflop_class_one(card1, card2)]
+
+
+def preflop_class_name(index):
+    row, column = divmod(int(index), NUM_RANKS)
+    if row == column:
+        return RANKS[row] * 2
+    if row > column:
+        return f'{RANKS[row]}{RANKS[column]}s'
+    return f'{RANKS[column]}{RANKS[row]}o'
+
+
+def preflop_class_holes():
+    # 每個類別在花色互換下最小的代表手牌 (169, 2)，已排序
+    row, column = _CLASS_ROWS, _CLASS_COLUMNS
+    high, low = np.maximum(row, column), np.minimum(row, column)
+    # 對子與不同花：較小的牌用第一個花色、另一張用第二個花色；同花都用第一個花色
+    second_suit = np.where(row > column, 0, 1)
+    return np.stack([low * 4, high * 4 + second_suit], axis=1)
+
+
+def canonical_keys(cards, num_hole=2):
+    # cards: (N, 張數)，前 num_hole 張為手牌、其餘為公共牌
+    # 對 24 種花色排列各自排序手牌與公共牌後以 52 進位打包，取最小值作為類別鍵
+    cards = np.asarray(cards, dtype=np.int64)
+    ranks = cards & ~3
+    suits = cards & 3
+    best = None
+    for permutation in SUIT_PERMUTATIONS:
+        mapped = ranks | permutation[suits]
+        mapped = np.concatenate([np.sort(mapped[:, :num_hole], axis=1), np.sort(mapped[:, num_hole:], axis=1)], axis=1)
+        keys = np.zeros(len(cards), dtype=np.int64)
+        for column in range(mapped.shape[1]):
+            keys = keys * NUM_CARDS + mapped[:, column]
+        best = keys if best is None else np.minimum(best, keys)
+    return best
+
+
+def decode_keys(keys, num_cards):
+    # canonical_keys 的反運算：(N,) → (N, num_cards) 的代表牌
+    keys = np.asarray(keys, dtype=np.int64)
+    cards = np.empty((len(keys), num_cards), dtype=np.int8)
+    for column in range(num_cards - 1, -1, -1):
+        keys, cards[:, column] = np.divmod(keys, NUM_CARDS)
+    return cards
+
+
+def _preflop_equities(index, holes, samples, entropy):
+    # 一個起手牌類別對 1..MAX_OPPONENTS 個隨機對手的勝率
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(0, index)))
+    hole = holes[index]
+    deck = np.setdiff1d(np.arange(NUM_CARDS), hole)
+    equities = np.empty(MAX_OPPONENTS, dtype=np.float32)
+    for num_opponents in range(1, MAX_OPPONENTS + 1):
+        num_drawn = 2 * num_opponents + 5
+        drawn = deck[np.argpartition(rng.random((samples, len(deck))), num_drawn, axis=1)[:, :num_drawn]]
+        sample_holes = np.concatenate([np.broadcast_to(hole, (samples, 1, 2)), drawn[:, :2 * num_opponents].reshape(samples, num_opponents, 2)], axis=1)
+        equities[num_opponents - 1] = board_equities(sample_holes, drawn[:, None, 2 * num_opponents:])[:, 0].mean()
+    return equities
+
+
+def _flop_chunk(keys, samples, entropy, chunk_index):
+    # 一批翻牌類別的目前牌型類別與抽樣河牌牌型類別的分布
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(1, chunk_index)))
+    cards = decode_keys(keys, 5).astype(np.int64)
+    categories = hand_category(evaluate_batch(cards)).astype(np.uint8)
+    boards = sample_boards(cards[:, 2:], remaining_deck(cards), 2, samples, rng)
+    hands = np.concatenate([np.broadcast_to(cards[:, None, :2], (len(cards), samples, 2)), boards], axis=2)
+    river = hand_category(evaluate_batch(hands.reshape(-1, 7))).reshape(len(cards), samples)
+    rows = np.repeat(np.arange(len(cards)), samples)
+    counts = np.bincount(rows * NUM_CATEGORIES + river.ravel(), minlength=len(cards) * NUM_CATEGORIES)
+    return categories, counts.reshape(len(cards), NUM_CATEGORIES).astype(np.uint8)
+
+
+def enumerate_flop_classes():
+    # 每個類別都有手牌為 169 個代表手牌之一的成員，只需列舉代表手牌 × 所有翻牌
+    # 回傳 (排序後的類別鍵, 各起手牌類別的翻牌牌型類別計數 (169, 類別數))
+    flops = np.array(list(itertools.combinations(range(NUM_CARDS), 3)), dtype=np.int64)
+    keys = []
+    flop_categories = np.zeros((NUM_PREFLOP_CLASSES, NUM_CATEGORIES), dtype=np.uint16)
+    for index, hole in enumerate(preflop_class_holes()):
+        board = flops[~np.isin(flops, hole).any(axis=1)]
+        cards = np.concatenate([np.broadcast_to(hole, (len(board), 2)), board], axis=1)
+        keys.append(np.unique(canonical_keys(cards)))
+        flop_categories[index] = np.bincount(hand_category(evaluate_batch(cards)), minlength=NUM_CATEGORIES)
+    return np.unique(np.concatenate(keys)), flop_categories
+
+
+def build_tables(path=CARD_CLASS_TABLES_PATH, workers=1, seed=CARD_CLASS_SEED, preflop_samples=PREFLOP_EQUITY_SAMPLES,
+                 flop_samples=FLOP_RUNOUT_SAMPLES, chunk_size=FLOP_CHUNK_SIZE):
+    # 計算所有類別表格並寫入 path；以固定種子分塊抽樣，結果與 worker 數無關
+    entropy = np.random.SeedSequence(seed).entropy
+    flop_keys, preflop_flop_categories = enumerate_flop_classes()
+    holes = preflop_class_holes()
+    chunks = [flop_keys[start:start + chunk_size] for start in range(0, len(flop_keys), chunk_size)]
+    if workers <= 1:
+        preflop_equity = [_preflop_equities(index, holes, preflop_samples, entropy) for index in range(NUM_PREFLOP_CLASSES)]
+        flop_results = [_flop_chunk(keys, flop_samples, entropy, index) for index, keys in enumerate(chunks)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            preflop_equity = list(executor.map(_preflop_equities, range(NUM_PREFLOP_CLASSES), [holes] * NUM_PREFLOP_CLASSES,
+                                               [preflop_samples] * NUM_PREFLOP_CLASSES, [entropy] * NUM_PREFLOP_CLASSES))
+            flop_results = list(executor.map(_flop_chunk, chunks, [flop_samples] * len(chunks), [entropy] * len(chunks), range(len(chunks))))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # 先寫入暫存檔再改名，避免中斷時留下損壞的檔案
+    temp_path = f'{path}.tmp.npz'
+    np.savez_compressed(
+        temp_path,
+        version=np.array(CARD_CLASS_TABLES_VERSION),
+        preflop_equity=np.stack(preflop_equity),
+        preflop_flop_categories=preflop_flop_categories,
+        flop_keys=flop_keys.astype(np.uint32),
+        flop_categories=np.concatenate([categories for categories, _ in flop_results]),
+        flop_river_categories=np.concatenate([counts for _, counts in flop_results]),
+    )
+    os.replace(temp_path, path)
+    return load_tables(path)
+
+
+class CardClassTables:
+    def __init__(self, preflop_equity, preflop_flop_categories, flop_keys, flop_categories, flop_river_categories):
+        # preflop_equity: (169, MAX_OPPONENTS)；preflop_flop_categories: (169, 類別數) 所有翻牌的牌型類別計數
+        # flop_keys: 排序後的翻牌類別鍵；flop_categories: 各翻牌類別目前的牌型類別；flop_river_categories: 抽樣河牌的牌型類別計數
+        self.preflop_equity = preflop_equity
+        self.preflop_flop_categories = preflop_flop_categories
+        self.flop_keys = flop_keys
+        self.flop_categories = flop_categories
+        self.flop_river_categories = flop_river_categories
+
+    def preflop_equities(self, holes, num_opponents):
+        # holes: (N, 2) 牌編碼 → 對 num_opponents 個隨機對手的勝率
+        if not 1 <= num_opponents <= MAX_OPPONENTS:
+            raise ValueError(f"num_opponents must be between 1 and {MAX_OPPONENTS}")
+        return self.preflop_equity[preflop_classes(holes), num_opponents - 1]
+
+    def preflop_flop_distribution(self, holes):
+        # 起手牌在所有可能翻牌上的牌型類別分布 (N, 類別數)
+        counts = self.preflop_flop_categories[preflop_classes(holes)].astype(float)
+        return counts / counts.sum(axis=-1, keepdims=True)
+
+    def flop_classes(self, cards):
+        # cards: (N, 5) 為兩張手牌加三張翻牌 → 翻牌類別索引
+        keys = canonical_keys(cards)
+        classes = np.searchsorted(self.flop_keys, keys)
+        if np.any(self.flop_keys[np.minimum(classes, len(self.flop_keys) - 1)] != keys):
+            raise ValueError("Invalid or duplicate cards")
+        return classes
+
+    def flop_river_distribution(self, cards):
+        # 兩張手牌加三張翻牌在河牌時的牌型類別分布 (N, 類別數)
+        counts = self.flop_river_categories[self.flop_classes(cards)].astype(float)
+        return counts / counts.sum(axis=-1, keepdims=True)
+
+
+_loaded_tables = {}
+
+
+def load_tables(path=CARD_CLASS_TABLES_PATH):
+    # 每個路徑只載入一次
+    path = os.path.abspath(path)
+    if path not in _loaded_tables:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Card class tables not found: {path} (build them with python card_classes.py)")
+        with np.load(path) as tables:
+            if int(tables['version']) != CARD_CLASS_TABLES_VERSION:
+                raise ValueError(f"Unsupported card class tables version {int(tables['version'])}: {path}")
+            _loaded_tables[path] = CardClassTables(tables['preflop_equity'], tables['preflop_flop_categories'], tables['flop_keys'],
+                                                   tables['flop_categories'], tables['flop_river_categories'])
+    return _loaded_tables[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute per-class preflop and flop tables under suit isomorphism.")
+    parser.add_argument('--output', default=CARD_CLASS_TABLES_PATH)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=CARD_CLASS_SEED)
+    parser.add_argument('--show', nargs=2, metavar='CARD', help="Print the preflop table rows for a starting hand, e.g. 'A of Spades' 'K of Spades'")
+    args = parser.parse_args()
+
+    if args.show:
+        tables = load_tables(args.output)
+        holes = encode_cards(args.show)[None, :]
+        print(preflop_class_name(preflop_classes(holes)[0]))
+        for num_opponents in range(1, MAX_OPPONENTS + 1):
+            print(f"  equity vs {num_opponents}: {tables.preflop_equities(holes, num_opponents)[0]:.3f}")
+        for name, probability in zip(CATEGORY_NAMES, tables.preflop_flop_distribution(holes)[0]):
+            print(f"  flop {name:<16} {probability:.3f}")
+        return
+
+    start = time.perf_counter()
+    tables = build_tables(args.output, args.workers, args.seed)
+    print(f"Wrote {args.output}: {NUM_PREFLOP_CLASSES} preflop classes, {len(tables.flop_keys):,} flop classes "
+          f"in {time.perf_counter() - start:.1f} s ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
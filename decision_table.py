@@ -0,0 +1,83 @@
+import numpy as np
+
+from card_classes import preflop_categories
+from hand_evaluator import CATEGORY_NAMES, evaluate_batch, hand_category
+
+# 查表的最後一維：沿用原本 recommend_action 依剩餘資金與底池判斷的各個分支，並不是依籌碼/底池比例切分的區間
+STACK_SHORT = 0      # 剩餘資金不足一個大盲
+STACK_MINIMUM = 1    # 剩餘資金不超過兩個小盲
+STACK_DEEP = 2       # 一般情況，底池比例 pot / (pot + 剩餘資金) 為正
+STACK_NO_POT = 3     # 一般情況，底池為 0
+STACK_NEGATIVE_POT = 4  # 一般情況，底池比例為負（輸入異常）
+NUM_STACK_BUCKETS = 5
+
+NUM_CATEGORIES = len(CATEGORY_NAMES)
+
+
+class DecisionTable:
+    def __init__(self, actions, raise_sizes, action_names, small_blind, big_blind):
+        # actions: (位置, 牌型類別, 籌碼分桶) 的動作索引；raise_sizes: (位置, 牌型類別)
+        # 基因只記錄牌型類別，不分街，所以查表也沒有街的維度
+        self.actions = actions
+        self.raise_sizes = raise_sizes
+        self.action_names = action_names
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.fold = action_names.index('fold')
+        self.call = action_names.index('call')
+        self.raise_ = action_names.index('raise')
+
+    def stack_bucket(self, remaining_funds, pot_size):
+        remaining_funds = np.asarray(remaining_funds, dtype=float)
+        pot_size = np.asarray(pot_size, dtype=float)
+        return np.select(
+            [remaining_funds < self.big_blind, remaining_funds <= self.small_blind * 2,
+             pot_size * (pot_size + remaining_funds) > 0, pot_size == 0],
+            [STACK_SHORT, STACK_MINIMUM, STACK_DEEP, STACK_NO_POT],
+            default=STACK_NEGATIVE_POT,
+        )
+
+    def lookup(self, position_index, hand_value, remaining_funds, pot_size):
+        # 回傳 (動作索引, 加注大小)；表格選擇加注以外的動作時加注大小為 0
+        remaining_funds = np.asarray(remaining_funds, dtype=float)
+        action = self.actions[position_index, hand_value, self.stack_bucket(remaining_funds, pot_size)]
+        raise_size = self.raise_sizes[position_index, hand_value]
+        is_raise = action == self.raise_
+        # 資金不足以加注時改為跟注或棄牌
+        downgrade = is_raise & (remaining_funds < raise_size)
+        action = np.where(downgrade, np.where(remaining_funds >= self.big_blind, self.call, self.fold), action)
+        return action, np.where(is_raise, raise_size, 0)
+
+    def lookup_one(self, position_index, hand_value, remaining_funds, pot_size):
+        # 單筆查詢的純 Python 版本，避免小陣列的 NumPy 開銷
+        if remaining_funds < self.big_blind:
+            bucket = STACK_SHORT
+        elif remaining_funds <= self.small_blind * 2:
+            bucket = STACK_MINIMUM
+        elif pot_size * (pot_size + remaining_funds) > 0:
+            bucket = STACK_DEEP
+        elif pot_size == 0:
+            bucket = STACK_NO_POT
+        else:
+            bucket = STACK_NEGATIVE_POT
+        action = int(self.actions[position_index, hand_value, bucket])
+        if action != self.raise_:
+            return action, 0
+        raise_size = float(self.raise_sizes[position_index, hand_value])
+        if remaining_funds < raise_size:
+            action = self.call if remaining_funds >= self.big_blind else self.fold
+        return action, raise_size
+
+    def hand_values(self, cards):
+        # cards: (N, 7) 牌編碼，未發出的公共牌為 -1；依張數分組批次評估
+        cards = np.asarray(cards)
+        num_cards = (cards >= 0).sum(axis=1)
+        values = np.zeros(len(cards), dtype=np.int8)
+        for count in np.unique(num_cards):
+            rows = num_cards == count
+            # 有效的牌都排在前面；只有手牌時以起手牌類別查表
+            if count == 2:
+                values[rows] = preflop_categories(cards[rows, :2])
+            else:
+                values[rows] = hand_category(evaluate_batch(cards[rows, :count]))
+        return values
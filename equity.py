@@ -0,0 +1,90 @@
+import numpy as np
+
+from hand_evaluator import NUM_CARDS, evaluate_batch
+
+# 翻牌前與翻牌圈抽樣的牌面數；轉牌與河牌直接窮舉
+EQUITY_SAMPLES = 64
+# 每批計算的局數，控制 (局, 牌面, 玩家) 陣列的大小
+EQUITY_BATCH_SIZE = 1024
+EQUITY_CHUNK_SIZE = 16384
+NUM_BOARD_CARDS = 5
+STREETS = [0, 3, 4, 5]
+
+
+def showdown_shares(strengths):
+    # 每個牌面上贏家平分底池：回傳各玩家分得的比例
+    winners = strengths == strengths.max(axis=-1, keepdims=True)
+    return winners / winners.sum(axis=-1, keepdims=True)
+
+
+def board_equities(holes, boards):
+    # holes: (局, 玩家, 2)，boards: (局, 牌面數, 5) → (局, 玩家) 的平均勝率（含平手分成）
+    num_games, num_players = holes.shape[:2]
+    num_boards = boards.shape[1]
+    hands = np.concatenate([
+        np.broadcast_to(holes[:, None], (num_games, num_boards, num_players, 2)),
+        np.broadcast_to(boards[:, :, None], (num_games, num_boards, num_players, NUM_BOARD_CARDS)),
+    ], axis=3)
+    strengths = evaluate_batch(hands.reshape(-1, 2 + NUM_BOARD_CARDS)).reshape(num_games, num_boards, num_players)
+    return showdown_shares(strengths).mean(axis=1)
+
+
+def remaining_deck(cards):
+    # 每局尚未出現的牌，(局, 52 - 已知張數)
+    alive = np.ones((len(cards), NUM_CARDS), dtype=bool)
+    alive[np.arange(len(cards))[:, None], cards] = False
+    return np.nonzero(alive)[1].reshape(len(cards), -1)
+
+
+def sample_boards(known, deck, num_missing, samples, rng):
+    # 從剩餘牌堆不重複地抽出缺少的公共牌，與已知公共牌組成 (局, samples, 5)
+    keys = rng.random((len(deck), samples, deck.shape[1]))
+    picks = np.argpartition(keys, num_missing, axis=2)[:, :, :num_missing]
+    drawn = np.take_along_axis(np.broadcast_to(deck[:, None], keys.shape), picks, axis=2)
+    return np.concatenate([np.broadcast_to(known[:, None], (len(deck), samples, known.shape[1])), drawn], axis=2)
+
+
+def street_equities(cards, num_players=6, samples=EQUITY_SAMPLES, rng=None, streets=STREETS):
+    # cards: (局, 2 * 玩家數 + 5) → (局, 玩家, 街) 的勝率，只把已發出的牌視為已知
+    # streets 為要計算的街（公共牌張數），預設為全部四條街
+    rng = np.random.default_rng(rng)
+    cards = np.asarray(cards, dtype=np.int64)
+    equities = np.empty((len(cards), num_players, len(streets)), dtype=np.float32)
+    for start in range(0, len(cards), EQUITY_BATCH_SIZE):
+        batch = cards[start:start + EQUITY_BATCH_SIZE]
+        holes = batch[:, :2 * num_players].reshape(len(batch), num_players, 2)
+        board = batch[:, 2 * num_players:]
+        for j, num_cards in enumerate(streets):
+            known = board[:, :num_cards]
+            deck = remaining_deck(np.concatenate([batch[:, :2 * num_players], known], axis=1))
+            num_missing = NUM_BOARD_CARDS - num_cards
+            if num_missing == 0:
+                boards = board[:, None]
+            elif num_missing == 1:
+                boards = np.concatenate([np.broadcast_to(known[:, None], (len(batch), deck.shape[1], num_cards)), deck[:, :, None]], axis=2)
+            else:
+                boards = sample_boards(known, deck, num_missing, samples, rng)
+            equities[start:start + len(batch), :, j] = board_equities(holes, boards)
+    return equities
+
+
+def _equity_chunk(cards, num_players, samples, entropy, spawn_key, streets):
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=spawn_key))
+    return street_equities(cards, num_players, samples, rng, streets)
+
+
+def compute_equities(cards, num_players=6, samples=EQUITY_SAMPLES, seed=None, workers=1, chunk_size=EQUITY_CHUNK_SIZE, offset=0,
+                     streets=STREETS):
+    # 依固定大小分塊，每塊以第一局在整個資料集中的索引（offset + 塊內起點）衍生子種子
+    # 結果與 worker 數無關；分批呼叫時傳入 offset 讓各批的亂數流不重複
+    # seed 可以是 SeedSequence，子種子沿用它的 spawn_key
+    seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    chunks = [(np.asarray(cards[start:start + chunk_size]), num_players, samples, seed.entropy, seed.spawn_key + (offset + start,), streets)
+              for start in range(0, len(cards), chunk_size)]
+    if not chunks:
+        return np.empty((0, num_players, len(streets)), dtype=np.float32)
+    if workers <= 1:
+        return np.concatenate([_equity_chunk(*chunk) for chunk in chunks])
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return np.concatenate(list(executor.map(_equity_chunk, *zip(*chunks))))
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Zobrist 雜湊：每個 (基因位置, 動作, 手牌價值) 對應一個 64-bit 亂數，個體雜湊為其 XOR
+# 改變單一基因時只需 XOR 掉舊值、XOR 上新值
+MAX_GENE_FIELD_VALUE = 16
+_ZOBRIST_SEED = 0x5EED
+_zobrist_tables = {}
+
+
+def zobrist_table(num_genes):
+    if num_genes not in _zobrist_tables:
+        rng = np.random.default_rng([_ZOBRIST_SEED, num_genes])
+        shape = (num_genes, MAX_GENE_FIELD_VALUE, MAX_GENE_FIELD_VALUE)
+        _zobrist_tables[num_genes] = rng.integers(np.iinfo(np.uint64).max, size=shape, dtype=np.uint64, endpoint=True)
+    return _zobrist_tables[num_genes]
+
+
+def gene_keys(population):
+    # population: (..., 基因數, 2) → 每個基因的雜湊值
+    table = zobrist_table(population.shape[-2])
+    return table[np.arange(population.shape[-2]), population[..., 0], population[..., 1]]
+
+
+def genome_hashes(population):
+    return np.bitwise_xor.reduce(gene_keys(population), axis=-1)
+
+
+class FitnessCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate, 'size': len(self.entries)}
+
+    def evaluate(self, population, hashes, evaluate):
+        # 只對快取中沒有的個體呼叫 evaluate，同一世代重複的個體也只計算一次
+        fitness = np.empty(len(population))
+        missing = []
+        for i, genome_hash in enumerate(hashes.tolist()):
+            value = self.entries.get(genome_hash)
+            if value is None:
+                missing.append(i)
+            else:
+                self.entries.move_to_end(genome_hash)
+                fitness[i] = value
+
+        num_evaluated = 0
+        if missing:
+            missing = np.array(missing)
+            unique_hashes, first, inverse = np.unique(hashes[missing], return_index=True, return_inverse=True)
+            values = evaluate(population[missing[first]])
+            fitness[missing] = values[inverse]
+            for genome_hash, value in zip(unique_hashes.tolist(), values.tolist()):
+                self.entries[genome_hash] = value
+                if len(self.entries) > self.capacity:
+                    self.entries.popitem(last=False)
+            num_evaluated = len(unique_hashes)
+        self.misses += num_evaluated
+        self.hits += len(population) - num_evaluated
+        return fitness
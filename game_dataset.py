@@ -0,0 +1,188 @@
+import argparse
+import struct
+
+import numpy as np
+
+from hand_evaluator import CARD_INDEX, card_to_int
+
+# 二進位牌局格式：檔頭 + 每局 (2 * 玩家數 + 5) 個 uint8 牌編碼
+MAGIC = b'THGD'
+VERSION = 1
+NUM_BOARD_CARDS = 5
+# magic, version, 玩家數, 公共牌數, 局數, 座位名稱長度
+_HEADER = struct.Struct('<4sHBBQH')
+_ALIGNMENT = 16
+
+DEFAULT_SEATS = ['Button', 'Small Blind', 'Big Blind', 'UTG', 'HighJack', 'CutOff']
+CSV_CHUNK_SIZE = 100000
+
+
+def card_columns(seats=DEFAULT_SEATS):
+    return [f'{seat} Hand {i}' for seat in seats for i in (1, 2)] + [f'Community Card {i+1}' for i in range(NUM_BOARD_CARDS)]
+
+
+def decode_card_columns(data, columns):
+    cards = np.empty((len(data), len(columns)), dtype=np.int8)
+    for j, column in enumerate(columns):
+        codes = data[column].map(CARD_INDEX)
+        missing = codes.isna()
+        if missing.any():
+            codes[missing] = data[column][missing].map(card_to_int)
+        cards[:, j] = codes.to_numpy()
+    return cards
+
+
+def _encode_header(seats, num_games):
+    names = '\n'.join(seats).encode('utf-8')
+    header = _HEADER.pack(MAGIC, VERSION, len(seats), NUM_BOARD_CARDS, num_games, len(names)) + names
+    padding = -len(header) % _ALIGNMENT
+    return header + b'\0' * padding
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        fixed = f.read(_HEADER.size)
+        if len(fixed) < _HEADER.size:
+            raise ValueError(f"Not a game dataset: {path}")
+        magic, version, num_players, num_board, num_games, names_length = _HEADER.unpack(fixed)
+        if magic != MAGIC:
+            raise ValueError(f"Not a game dataset: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported game dataset version {version}: {path}")
+        seats = f.read(names_length).decode('utf-8').split('\n')
+    offset = _HEADER.size + names_length
+    offset += -offset % _ALIGNMENT
+    return {
+        'seats': seats,
+        'num_players': num_players,
+        'num_board_cards': num_board,
+        'num_games': num_games,
+        'offset': offset,
+    }
+
+
+def is_game_dataset(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class GameDataset:
+    def __init__(self, path):
+        header = read_header(path)
+        self.path = path
+        self.seats = header['seats']
+        self.num_players = header['num_players']
+        row_size = 2 * self.num_players + header['num_board_cards']
+        if header['num_games']:
+            self.cards = np.memmap(path, dtype=np.uint8, mode='r', offset=header['offset'],
+                                   shape=(header['num_games'], row_size))
+        else:
+            self.cards = np.empty((0, row_size), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def seat_columns(self, seats):
+        # 依指定座位順序排列的欄位索引；與檔案順序相同時回傳 None
+        missing = [seat for seat in seats if seat not in self.seats]
+        if missing:
+            raise ValueError(f"Seats {missing} not found in dataset {self.path}")
+        if list(seats) == self.seats:
+            return None
+        columns = [2 * self.seats.index(seat) + i for seat in seats for i in (0, 1)]
+        return columns + list(range(2 * self.num_players, self.cards.shape[1]))
+
+    def seat_cards(self, seats):
+        # 依指定座位順序取出欄位，回傳 (局數, 2 * len(seats) + 5) 的視圖或副本
+        columns = self.seat_columns(seats)
+        return self.cards if columns is None else self.cards[:, columns]
+
+    def iter_chunks(self, chunk_size, start=0):
+        for chunk_start in range(start, len(self.cards), chunk_size):
+            yield self.cards[chunk_start:chunk_start + chunk_size]
+
+    def iter_seat_chunks(self, seats, chunk_size, start=0):
+        # 分塊版的 seat_cards，一次只複製一塊
+        columns = self.seat_columns(seats)
+        for chunk in self.iter_chunks(chunk_size, start):
+            yield chunk if columns is None else chunk[:, columns]
+
+
+class GameDatasetWriter:
+    def __init__(self, path, seats=DEFAULT_SEATS, append=False):
+        # append 時接在既有檔案的最後一局之後，座位與每局張數必須與檔頭相同；關閉時回填總局數
+        self.path = path
+        self.seats = list(seats)
+        self.row_size = 2 * len(self.seats) + NUM_BOARD_CARDS
+        self.num_games = 0
+        if append:
+            header = read_header(path)
+            if header['seats'] != self.seats or header['num_board_cards'] != NUM_BOARD_CARDS:
+                raise ValueError(f"Cannot append games with seats {self.seats} to dataset {path} with seats {header['seats']}")
+            self.num_games = header['num_games']
+            self.file = open(path, 'r+b')
+            # 上次寫入中斷時檔頭尚未計入的資料一併捨棄
+            self.file.seek(header['offset'] + self.num_games * self.row_size)
+            self.file.truncate()
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(_encode_header(self.seats, 0))
+
+    def write(self, cards):
+        cards = np.ascontiguousarray(cards, dtype=np.uint8)
+        if cards.ndim != 2 or cards.shape[1] != self.row_size:
+            raise ValueError(f"Expected games with {self.row_size} cards, got shape {cards.shape}")
+        self.file.write(cards.tobytes())
+        self.num_games += len(cards)
+
+    def close(self):
+        if self.file.closed:
+            return
+        # 寫完後回填局數（包含附加前已有的局數）
+        self.file.flush()
+        self.file.seek(0)
+        self.file.write(_encode_header(self.seats, self.num_games))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def write_games(path, cards, seats=DEFAULT_SEATS):
+    with GameDatasetWriter(path, seats) as writer:
+        writer.write(cards)
+
+
+def read_csv_cards(csv_path, seats=DEFAULT_SEATS, chunksize=CSV_CHUNK_SIZE, start=0):
+    # start 為略過的局數，用於只讀取檔案後來附加的牌局
+    import pandas as pd
+
+    columns = card_columns(seats)
+    # 以函式略過前面的列：pandas 會把 range 之類的列表轉成 set，局數很多時會配置大量記憶體
+    skiprows = (lambda row: 0 < row <= start) if start else None
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunksize, skiprows=skiprows):
+        yield decode_card_columns(chunk, columns)
+
+
+def convert_csv(csv_path, out_path, seats=DEFAULT_SEATS, chunksize=CSV_CHUNK_SIZE):
+    with GameDatasetWriter(out_path, seats) as writer:
+        for cards in read_csv_cards(csv_path, seats, chunksize):
+            writer.write(cards)
+    return writer.num_games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a poker games CSV to the binary game dataset format.")
+    parser.add_argument('csv_path')
+    parser.add_argument('out_path')
+    parser.add_argument('--seats', nargs='+', default=DEFAULT_SEATS)
+    args = parser.parse_args()
+    num_games = convert_csv(args.csv_path, args.out_path, args.seats)
+    print(f"Wrote {num_games} games to {args.out_path}")
+
+
+if __name__ == '__main__':
+    main()
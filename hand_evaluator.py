@@ -0,0 +1,194 @@
+import numpy as np
+
+# 牌的整數編碼：card = rank * 4 + suit，rank 0..12 對應 2..A，suit 0..3 對應 C/D/H/S
+RANKS = '23456789TJQKA'
+SUITS = 'CDHS'
+RANK_NAMES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+SUIT_NAMES = ['Clubs', 'Diamonds', 'Hearts', 'Spades']
+NUM_CARDS = 52
+
+CATEGORY_NAMES = [
+    'High Card', 'One Pair', 'Two Pair', 'Three of a Kind', 'Straight',
+    'Flush', 'Full House', 'Four of a Kind', 'Straight Flush',
+]
+
+# 強度編碼：category << 20，後面接最多五個 4-bit 的 rank+1（0 表示不存在）
+CATEGORY_SHIFT = 20
+
+
+def card_to_int(card):
+    try:
+        rank, suit = card.split(' of ')
+        if rank == '10':
+            rank = 'T'
+        suit = suit[0]
+        if rank not in RANKS or suit not in SUITS or len(rank) != 1:
+            raise ValueError(f"Invalid card format: {card}")
+        return RANKS.index(rank) * 4 + SUITS.index(suit)
+    except (ValueError, AttributeError, IndexError):
+        raise ValueError(f"Invalid card format: {card}")
+
+
+def int_to_card(code):
+    return f'{RANK_NAMES[code >> 2]} of {SUIT_NAMES[code & 3]}'
+
+
+# 所有合法字串到整數編碼的對照表，批次解碼時避免重複解析
+CARD_INDEX = {int_to_card(code): code for code in range(NUM_CARDS)}
+CARD_INDEX.update({f'T of {SUIT_NAMES[code & 3]}': code for code in range(32, 36)})
+
+
+def encode_cards(cards):
+    return np.array([CARD_INDEX[card] if card in CARD_INDEX else card_to_int(card) for card in cards], dtype=np.int8)
+
+
+def _build_tables():
+    # 以 NumPy 一次計算所有 rank 遮罩，避免匯入時跑 8192 次的 Python 迴圈
+    size = 1 << 13
+    masks = np.arange(size)
+    # bits[:, j] 為 rank 12 - j 是否存在（由大到小），order 為該 rank 在存在的 rank 中的名次
+    bits = (masks[:, None] >> np.arange(12, -1, -1)) & 1
+    order = np.cumsum(bits, axis=1)
+    values = np.arange(13, 0, -1)
+    # top[k] 為最大的 k 個 rank+1 依序打包；不足 k 張時以 0 補齊低位，讓不同張數的手牌仍可比較
+    top = np.zeros((6, size), dtype=np.int32)
+    for k in range(1, 6):
+        selected = (bits == 1) & (order <= k)
+        top[k] = np.where(selected, values << (4 * np.maximum(k - order, 0)), 0).sum(axis=1)
+
+    # 由小到大檢查每個順子的視窗，較大的順子覆蓋較小的；high == 3 為 A-2-3-4-5
+    straight = np.zeros(size, dtype=np.int32)
+    for high in range(3, 13):
+        window = 0b1111 | (1 << 12) if high == 3 else 0b11111 << (high - 4)
+        straight[masks & window == window] = high + 1
+    return top, straight
+
+
+_TOP, _STRAIGHT = _build_tables()
+# 以 rank+1 索引的單一 bit，0 代表沒有
+_BIT = np.array([0] + [1 << rank for rank in range(13)], dtype=np.int32)
+_POW2 = np.array([1 << rank for rank in range(13)], dtype=np.int32)
+
+# 純 Python 版本使用的表格，避免標量路徑觸發 NumPy 開銷
+_TOP_LIST = [row.tolist() for row in _TOP]
+_STRAIGHT_LIST = _STRAIGHT.tolist()
+_BIT_LIST = _BIT.tolist()
+
+
+def evaluate(cards):
+    top1, top2, top3, top5 = _TOP_LIST[1], _TOP_LIST[2], _TOP_LIST[3], _TOP_LIST[5]
+    bit = _BIT_LIST
+    counts = [0] * 13
+    suit_counts = [0] * 4
+    suit_masks = [0] * 4
+    for card in cards:
+        rank = card >> 2
+        suit = card & 3
+        counts[rank] += 1
+        suit_counts[suit] += 1
+        suit_masks[suit] |= 1 << rank
+
+    m1 = m2 = m3 = m4 = 0
+    for rank in range(13):
+        count = counts[rank]
+        if count:
+            m1 |= 1 << rank
+            if count >= 2:
+                m2 |= 1 << rank
+                if count >= 3:
+                    m3 |= 1 << rank
+                    if count == 4:
+                        m4 |= 1 << rank
+
+    flush_mask = 0
+    for suit in range(4):
+        if suit_counts[suit] >= 5:
+            flush_mask = suit_masks[suit]
+
+    if flush_mask:
+        high = _STRAIGHT_LIST[flush_mask]
+        if high:
+            return (8 << CATEGORY_SHIFT) | (high << 16)
+    quad = top1[m4]
+    if quad:
+        return (7 << CATEGORY_SHIFT) | (quad << 16) | (top1[m1 & ~bit[quad]] << 12)
+    trips = top1[m3]
+    if trips:
+        pair = top1[m2 & ~bit[trips]]
+        if pair:
+            return (6 << CATEGORY_SHIFT) | (trips << 16) | (pair << 12)
+    if flush_mask:
+        return (5 << CATEGORY_SHIFT) | top5[flush_mask]
+    high = _STRAIGHT_LIST[m1]
+    if high:
+        return (4 << CATEGORY_SHIFT) | (high << 16)
+    if trips:
+        return (3 << CATEGORY_SHIFT) | (trips << 16) | (top2[m1 & ~bit[trips]] << 8)
+    pair1 = top1[m2]
+    if pair1:
+        pair2 = top1[m2 & ~bit[pair1]]
+        if pair2:
+            kicker = top1[m1 & ~bit[pair1] & ~bit[pair2]]
+            return (2 << CATEGORY_SHIFT) | (pair1 << 16) | (pair2 << 12) | (kicker << 8)
+        return (1 << CATEGORY_SHIFT) | (pair1 << 16) | (top3[m1 & ~bit[pair1]] << 4)
+    return top5[m1]
+
+
+def evaluate_batch(cards):
+    cards = np.asarray(cards)
+    if cards.ndim == 1:
+        cards = cards[None, :]
+    num_hands = cards.shape[0]
+    cards = cards.astype(np.int32, copy=False)
+    ranks = cards >> 2
+    suits = cards & 3
+    rank_bits = _POW2[ranks]
+
+    rows = np.arange(num_hands, dtype=np.int64)[:, None]
+    counts = np.bincount((rows * 13 + ranks).ravel(), minlength=num_hands * 13).reshape(num_hands, 13)
+    suit_counts = np.bincount((rows * 4 + suits).ravel(), minlength=num_hands * 4).reshape(num_hands, 4)
+
+    m1 = np.bitwise_or.reduce(rank_bits, axis=1)
+    m2 = (counts >= 2) @ _POW2
+    m3 = (counts >= 3) @ _POW2
+    m4 = (counts == 4) @ _POW2
+
+    flush_suit = suit_counts.argmax(axis=1)
+    is_flush = suit_counts[np.arange(num_hands), flush_suit] >= 5
+    flush_mask = np.bitwise_or.reduce(np.where(suits == flush_suit[:, None], rank_bits, 0), axis=1)
+    flush_mask = np.where(is_flush, flush_mask, 0)
+
+    top1, top2, top3, top5 = _TOP[1], _TOP[2], _TOP[3], _TOP[5]
+    sf_high = _STRAIGHT[flush_mask]
+    quad = top1[m4]
+    trips = top1[m3]
+    fh_pair = top1[m2 & ~_BIT[trips]]
+    straight_high = _STRAIGHT[m1]
+    pair1 = top1[m2]
+    pair2 = top1[m2 & ~_BIT[pair1]]
+
+    conditions = [
+        sf_high > 0,
+        quad > 0,
+        (trips > 0) & (fh_pair > 0),
+        is_flush,
+        straight_high > 0,
+        trips > 0,
+        pair2 > 0,
+        pair1 > 0,
+    ]
+    choices = [
+        (8 << CATEGORY_SHIFT) | (sf_high << 16),
+        (7 << CATEGORY_SHIFT) | (quad << 16) | (top1[m1 & ~_BIT[quad]] << 12),
+        (6 << CATEGORY_SHIFT) | (trips << 16) | (fh_pair << 12),
+        (5 << CATEGORY_SHIFT) | top5[flush_mask],
+        (4 << CATEGORY_SHIFT) | (straight_high << 16),
+        (3 << CATEGORY_SHIFT) | (trips << 16) | (top2[m1 & ~_BIT[trips]] << 8),
+        (2 << CATEGORY_SHIFT) | (pair1 << 16) | (pair2 << 12) | (top1[m1 & ~_BIT[pair1] & ~_BIT[pair2]] << 8),
+        (1 << CATEGORY_SHIFT) | (pair1 << 16) | (top3[m1 & ~_BIT[pair1]] << 4),
+    ]
+    return np.select(conditions, choices, default=top5[m1]).astype(np.int32)
+
+
+def hand_category(strength):
+    return strength >> CATEGORY_SHIFT
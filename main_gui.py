@@ -1,15 +1,28 @@
+import argparse
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
-from strategy_optimizer import StrategyOptimizer
+# 只匯入標準函式庫的設定；NumPy、推薦與訓練模組在視窗出現後才於背景執行緒載入
+from strategy_config import NUM_GENERATIONS, POSITIONS, StrategyConfig
+
+DATA_PATH = 'Texas_Holdem/poker_games_detailed2.csv'
 
 class PokerGUI:
-    def __init__(self, master):
+    def __init__(self, master, data_path=DATA_PATH, artifact=None):
         self.master = master
         master.title("Poker Strategy Optimizer")
+        self.data_path = data_path
+        self.artifact = artifact
 
-        self.optimizer = StrategyOptimizer('Texas_Holdem/poker_games_detailed2.csv')
-        self.optimizer.optimize_strategy()
+        # 訓練在背景執行緒進行，透過佇列把進度傳回 Tk 主迴圈
+        self.optimizer = None
+        # 每個位置的世代上限；載入或建立策略後改用其設定
+        self.num_generations = NUM_GENERATIONS
+        self.ready_positions = set()
+        self.training_events = queue.Queue()
+        self.cancel_event = threading.Event()
 
         # 設置主框架
         main_frame = ttk.Frame(master, padding="10")
@@ -19,9 +32,10 @@ class PokerGUI:
         self.label = ttk.Label(main_frame, text="Enter Position, Hand, Community Cards, and Funds:", font=("Helvetica", 16))
         self.label.grid(row=0, column=0, columnspan=3, pady=10)
 
-        # 添加小標題
-        self.blind_label = ttk.Label(main_frame, text="Big Blind: $20  |  Small Blind: $10", font=("Helvetica", 12), anchor=tk.CENTER)
+        # 添加小標題；載入策略後改為該策略訓練時的盲注
+        self.blind_label = ttk.Label(main_frame, font=("Helvetica", 12), anchor=tk.CENTER)
         self.blind_label.grid(row=1, column=0, columnspan=3, pady=5)
+        self.show_blinds(StrategyConfig())
 
         # 添加資金輸入框
         self.initial_funds_label = ttk.Label(main_frame, text="Initial Funds:", font=("Helvetica", 12))
@@ -101,8 +115,101 @@ class PokerGUI:
             self.community_suit_vars.append(community_suit_var)
 
         # 添加推薦動作按鈕
-        self.recommend_button = ttk.Button(main_frame, text="Recommend Action", command=self.recommend_action)
+        self.recommend_button = ttk.Button(main_frame, text="Recommend Action", command=self.recommend_action, state=tk.DISABLED)
         self.recommend_button.grid(row=15, column=0, columnspan=3, pady=10)
+        self.position_var.trace_add('write', lambda *args: self.update_recommend_button())
+
+        # 訓練進度
+        self.progress_bar = ttk.Progressbar(main_frame, maximum=len(POSITIONS) * self.num_generations, mode='determinate')
+        self.progress_bar.grid(row=16, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        self.cancel_button = ttk.Button(main_frame, text="Cancel Training", command=self.cancel_event.set)
+        self.cancel_button.grid(row=16, column=2, sticky=(tk.W, tk.E), pady=5)
+        self.status_var = tk.StringVar(master, value="Loading strategy...")
+        self.status_label = ttk.Label(main_frame, textvariable=self.status_var, font=("Helvetica", 10))
+        self.status_label.grid(row=17, column=0, columnspan=3, sticky=tk.W)
+
+        threading.Thread(target=self.train_in_background, daemon=True).start()
+        self.master.after(100, self.poll_training)
+
+    def train_in_background(self):
+        events = self.training_events
+        try:
+            # 有相符的訓練結果時直接載入，否則重新訓練並寫入快取；只有需要訓練時才載入訓練模組
+            from strategy_store import load_cached_strategy, load_strategy, train_strategy
+            optimizer = load_strategy(self.artifact) if self.artifact else load_cached_strategy(self.data_path)
+            if optimizer is not None:
+                events.put(('optimizer', optimizer))
+                for position in POSITIONS:
+                    events.put(('ready', position))
+                events.put(('done', True))
+                return
+
+            from strategy_optimizer import StrategyOptimizer
+            optimizer = StrategyOptimizer(self.data_path)
+            events.put(('optimizer', optimizer))
+            path = train_strategy(
+                optimizer,
+                progress=lambda position, generation, best_fitness: events.put(('progress', position, generation, best_fitness)),
+                position_ready=lambda position: events.put(('ready', position)),
+                should_stop=self.cancel_event.is_set,
+            )
+            events.put(('done', path is not None))
+        except Exception as e:
+            events.put(('error', str(e)))
+
+    def poll_training(self):
+        progress = None
+        while True:
+            try:
+                event = self.training_events.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == 'optimizer':
+                self.optimizer = event[1]
+                self.show_blinds(self.optimizer.config)
+                self.num_generations = self.optimizer.config.num_generations
+                self.progress_bar['maximum'] = len(POSITIONS) * self.num_generations
+            elif kind == 'progress':
+                # 只顯示最新一筆進度，避免每個世代都重繪
+                progress = event[1:]
+            elif kind == 'ready':
+                # 提前停止的位置不會跑滿世代上限，完成時直接跳到該位置區段的結尾
+                self.ready_positions.add(event[1])
+                self.progress_bar['value'] = (POSITIONS.index(event[1]) + 1) * self.num_generations
+                self.update_recommend_button()
+            elif kind == 'done':
+                self.finish_training(event[1])
+                return
+            elif kind == 'error':
+                self.cancel_button.state(['disabled'])
+                self.status_var.set("Training failed.")
+                messagebox.showerror("Error", f"Training failed: {event[1]}")
+                return
+
+        # 已完成的位置可能還有延遲送達的進度，忽略以免進度條倒退
+        if progress and progress[0] not in self.ready_positions:
+            position, generation, best_fitness = progress
+            self.progress_bar['value'] = POSITIONS.index(position) * self.num_generations + generation
+            self.status_var.set(f"Training {position}: generation {generation}/{self.num_generations}, best fitness {best_fitness:.1f}")
+        self.master.after(100, self.poll_training)
+
+    def finish_training(self, complete):
+        self.cancel_button.state(['disabled'])
+        if complete:
+            self.progress_bar['value'] = self.progress_bar['maximum']
+            self.status_var.set("Strategies ready.")
+        else:
+            self.status_var.set(f"Training cancelled: {len(self.ready_positions)}/{len(POSITIONS)} positions ready.")
+
+    def show_blinds(self, config):
+        self.blind_label['text'] = f"Big Blind: ${config.big_blind_amount:g}  |  Small Blind: ${config.small_blind_amount:g}"
+
+    def update_recommend_button(self):
+        if self.position_var.get() in self.ready_positions:
+            self.recommend_button.state(['!disabled'])
+        else:
+            self.recommend_button.state(['disabled'])
 
     def recommend_action(self):
         position = self.position_var.get()
@@ -142,6 +249,10 @@ class PokerGUI:
             messagebox.showerror("Error", str(e))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recommend poker actions from a trained strategy.")
+    parser.add_argument('data_path', nargs='?', default=DATA_PATH)
+    parser.add_argument('--artifact', help="Load this strategy artifact instead of looking one up for data_path")
+    args = parser.parse_args()
     root = tk.Tk()
-    gui = PokerGUI(root)
+    gui = PokerGUI(root, args.data_path, args.artifact)
     root.mainloop()
@@ -0,0 +1,67 @@
+import cProfile
+import functools
+import io
+import pstats
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    def __init__(self, profile=False):
+        # profile 時同時以 cProfile 記錄所有階段內的函式呼叫
+        self.records = []
+        self.profiler = cProfile.Profile() if profile else None
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name, position=None):
+        # 巢狀的階段各自記錄時間，cProfile 只在最外層開關
+        if self.profiler and self._depth == 0:
+            self.profiler.enable()
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, position)
+            self._depth -= 1
+            if self.profiler and self._depth == 0:
+                self.profiler.disable()
+
+    def add(self, name, seconds, position=None):
+        self.records.append({'stage': name, 'position': position, 'seconds': seconds})
+
+    def totals(self):
+        # 依 (階段, 位置) 加總
+        totals = {}
+        for record in self.records:
+            key = (record['stage'], record['position'])
+            total = totals.setdefault(key, {'stage': record['stage'], 'position': record['position'], 'seconds': 0.0, 'calls': 0})
+            total['seconds'] += record['seconds']
+            total['calls'] += 1
+        return list(totals.values())
+
+    def profile_rows(self, limit=25):
+        # 依累計時間排序的前 limit 個函式
+        if not self.profiler:
+            return []
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({'function': f'{filename}:{line}({function})', 'calls': calls, 'own_seconds': own, 'cumulative_seconds': cumulative})
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return rows[:limit]
+
+
+def timed_stage(name, by_position=False):
+    # 方法裝飾器：物件的 stage_timer 不為 None 時記錄執行時間；by_position 時以第一個參數作為位置
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.stage_timer is None:
+                return method(self, *args, **kwargs)
+            position = (args[0] if args else kwargs.get('position')) if by_position else None
+            with self.stage_timer.stage(name, position):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
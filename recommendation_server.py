@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+
+from equity import EQUITY_SAMPLES
+from hand_evaluator import encode_cards
+from strategy_config import ACTIONS, EV_MODELS, POSITIONS
+from strategy_store import DEFAULT_CACHE_DIR, load_config, load_or_train, load_strategy
+
+# 一批最多合併的請求數，以及第一個請求到達後最多等待其他請求的時間
+MAX_BATCH_SIZE = 1024
+MAX_WAIT_MS = 2.0
+# 延遲百分位數只看最近這麼多個請求
+LATENCY_WINDOW = 10000
+MAX_BODY_SIZE = 1 << 20
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+NUM_CARD_SLOTS = 7
+
+
+def parse_situation(request):
+    # 回傳 (位置索引, 牌編碼, 剩餘資金, 底池)；牌編碼未發出的公共牌為 -1
+    if not isinstance(request, dict):
+        raise ValueError("Each request must be a JSON object")
+    position = request.get('position')
+    if position not in POSITIONS:
+        raise ValueError(f"Unknown position {position!r}, expected one of {POSITIONS}")
+    hand = request.get('hand', [])
+    community_cards = request.get('community_cards', [])
+    if len(hand) != 2 or len(community_cards) > 5:
+        raise ValueError("Expected 2 hand cards and at most 5 community cards")
+    codes = encode_cards(list(hand) + list(community_cards))
+    if len(set(codes.tolist())) != len(codes):
+        raise ValueError("Duplicate cards")
+    cards = np.full(NUM_CARD_SLOTS, -1, dtype=np.int8)
+    cards[:len(codes)] = codes
+    try:
+        remaining_funds = float(request['remaining_funds'])
+        pot_size = float(request.get('pot_size', 0))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("remaining_funds and pot_size must be numbers")
+    # float() 也接受 'nan' 與 'inf'，查表時的比較會全部為 False
+    if not math.isfinite(remaining_funds) or not math.isfinite(pot_size):
+        raise ValueError("remaining_funds and pot_size must be finite numbers")
+    return POSITIONS.index(position), cards, remaining_funds, pot_size
+
+
+class LatencyTracker:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentiles(self, percents=(50, 90, 99)):
+        # 毫秒
+        if not self.samples:
+            return {f'p{percent}': None for percent in percents}
+        values = np.percentile(np.array(self.samples) * 1000, percents)
+        return {f'p{percent}': float(value) for percent, value in zip(percents, values)}
+
+
+class RecommendationBatcher:
+    def __init__(self, optimizer, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.optimizer = optimizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.latency = LatencyTracker()
+        self.num_requests = 0
+        self.num_batches = 0
+        self.max_queue_depth = 0
+
+    async def recommend(self, situation):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((situation, future, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return await future
+
+    async def collect_batch(self):
+        # 等第一個請求，之後在 max_wait 內盡量收集到 max_batch_size 個
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def evaluate(self, batch):
+        positions, cards, remaining_funds, pot_sizes = zip(*(situation for situation, _, _ in batch))
+        actions, raise_sizes = self.optimizer.recommend_actions(np.array(positions), np.stack(cards), np.array(remaining_funds),
+                                                                np.array(pot_sizes))
+        return [
+            {'action': ACTIONS[action], 'raise_size': raise_size} if raise_size else {'action': ACTIONS[action]}
+            for action, raise_size in zip(actions.tolist(), raise_sizes.tolist())
+        ]
+
+    async def run(self):
+        while True:
+            batch = await self.collect_batch()
+            # 等待期間可能已被取消（連線中斷）
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+            try:
+                results = self.evaluate(batch)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            now = time.perf_counter()
+            for (_, future, start), result in zip(batch, results):
+                future.set_result(result)
+                self.latency.add(now - start)
+            self.num_requests += len(batch)
+            self.num_batches += 1
+
+    def metrics(self):
+        return {
+            'requests': self.num_requests,
+            'batches': self.num_batches,
+            'mean_batch_size': self.num_requests / self.num_batches if self.num_batches else 0.0,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'latency_ms': self.latency.percentiles(),
+        }
+
+
+class RecommendationServer:
+    def __init__(self, optimizer, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.batcher = RecommendationBatcher(optimizer, max_batch_size, max_wait_ms)
+
+    async def route(self, method, path, body):
+        # 回傳 (HTTP 狀態, JSON 內容)
+        if path == '/health':
+            return HTTPStatus.OK, {'status': 'ok'}
+        if path == '/metrics':
+            return HTTPStatus.OK, self.batcher.metrics()
+        if path != '/recommend':
+            return HTTPStatus.NOT_FOUND, {'error': f'Unknown path {path}'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use POST'}
+        # 一個物件或物件陣列；陣列中的每個請求各自進入批次佇列
+        try:
+            payload = json.loads(body)
+            requests = payload if isinstance(payload, list) else [payload]
+            situations = [parse_situation(request) for request in requests]
+        except (ValueError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        try:
+            results = await asyncio.gather(*(self.batcher.recommend(situation) for situation in situations))
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        return HTTPStatus.OK, (results if isinstance(payload, list) else results[0])
+
+    async def handle_connection(self, reader, writer):
+        # 最小的 HTTP/1.1 實作：支援 keep-alive 與 Content-Length，不支援 chunked 傳輸
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_SIZE:
+                    status, response = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'Request body too large'}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, response = await self.route(method, path.split('?')[0], body)
+                    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                content = json.dumps(response).encode('utf-8')
+                writer.write(f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                             f'Content-Type: application/json\r\nContent-Length: {len(content)}\r\n'
+                             f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        batch_task = asyncio.create_task(self.batcher.run())
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving recommendations on {unix_path or f'http://{host}:{port}'}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+            if unix_path and os.path.exists(unix_path):
+                os.remove(unix_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve strategy recommendations over local HTTP.")
+    parser.add_argument('data_path', nargs='?', default='Texas_Holdem/poker_games_detailed2.csv')
+    parser.add_argument('--artifact', help="Load this strategy artifact instead of looking one up for data_path")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--islands', type=int, default=1)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--ev-model', choices=EV_MODELS, default='legacy')
+    parser.add_argument('--equity-samples', type=int, default=EQUITY_SAMPLES)
+    parser.add_argument('--config', help="JSON file of StrategyConfig values overriding the defaults; artifacts carry their own config")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Listen on this Unix socket instead of TCP")
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    # 只載入一次；沒有快取時訓練並寫入快取
+    if args.artifact:
+        optimizer = load_strategy(args.artifact)
+    else:
+        optimizer = load_or_train(args.data_path, args.seed, args.workers, args.islands, args.cache_dir, args.ev_model, args.equity_samples,
+                                  load_config(args.config))
+    server = RecommendationServer(optimizer, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
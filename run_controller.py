@@ -0,0 +1,96 @@
+import numpy as np
+
+# 每個世代記錄的欄位
+HISTORY_BEST = 0
+HISTORY_MEAN = 1
+HISTORY_DIVERSITY = 2
+HISTORY_FIELDS = ['best', 'mean', 'diversity']
+
+# record() 的決定
+CONTINUE = 'continue'
+STOP = 'stop'
+RESTART = 'restart'
+
+# 基因的兩個欄位都小於 16，合成一個代碼後計算每個基因位置的分布
+_GENE_CODES = 256
+
+
+def population_diversity(population):
+    # 每個基因位置上與最常見基因不同的個體比例，取所有位置的平均；0 表示族群完全收斂
+    size, num_genes = population.shape[:2]
+    codes = population[..., 0].astype(np.intp) * 16 + population[..., 1]
+    counts = np.bincount((codes + np.arange(num_genes) * _GENE_CODES).ravel(), minlength=num_genes * _GENE_CODES)
+    return 1.0 - counts.reshape(num_genes, _GENE_CODES).max(axis=1).mean() / size
+
+
+class RunController:
+    def __init__(self, num_generations, elite_count=0, patience=0, min_delta=0.0, min_diversity=0.0, max_restarts=0):
+        # patience 為 0 時不提早停止；min_diversity 為 0 時不檢查收斂
+        self.num_generations = num_generations
+        self.elite_count = elite_count
+        self.patience = patience
+        self.min_delta = min_delta
+        self.min_diversity = min_diversity
+        self.max_restarts = max_restarts
+        self.history = np.empty((num_generations, len(HISTORY_FIELDS)))
+        self.generation = 0
+        self.restarts = 0
+        self.stop_reason = None
+        self.best_genome = None
+        self.best_fitness = -np.inf
+        self._best_mean = -np.inf
+        self._last_improvement = 0
+
+    def elite_indices(self, fitness_scores):
+        # 適應度最高的 elite_count 個個體，由高到低
+        if self.elite_count <= 0:
+            return np.empty(0, dtype=np.intp)
+        top = np.argpartition(fitness_scores, -self.elite_count)[-self.elite_count:]
+        return top[np.argsort(fitness_scores[top], kind='stable')[::-1]]
+
+    def record(self, population, fitness_scores):
+        # 記錄一個已評估的世代並決定下一步
+        best = int(np.argmax(fitness_scores))
+        best_fitness = float(fitness_scores[best])
+        mean_fitness = float(fitness_scores.mean())
+        diversity = population_diversity(population) if self.min_diversity > 0 else np.nan
+        self.history[self.generation] = best_fitness, mean_fitness, diversity
+        self.generation += 1
+
+        # 保留整個執行過程中最好的個體，族群緩衝區之後會被改寫
+        if best_fitness > self.best_fitness:
+            self.best_genome = population[best].copy()
+        improved = best_fitness > self.best_fitness + self.min_delta or mean_fitness > self._best_mean + self.min_delta
+        self.best_fitness = max(self.best_fitness, best_fitness)
+        self._best_mean = max(self._best_mean, mean_fitness)
+        if improved:
+            self._last_improvement = self.generation
+
+        if self.generation >= self.num_generations:
+            self.stop_reason = 'max_generations'
+            return STOP
+        if self.patience and self.generation - self._last_improvement >= self.patience:
+            self.stop_reason = 'patience'
+            return STOP
+        if diversity < self.min_diversity:
+            if self.restarts >= self.max_restarts:
+                self.stop_reason = 'converged'
+                return STOP
+            self.restarts += 1
+            # 重新開始後給新族群完整的 patience
+            self._last_improvement = self.generation
+            self._best_mean = -np.inf
+            return RESTART
+        return CONTINUE
+
+    def fitness_history(self):
+        # (世代數, 3) 的陣列：最佳適應度、平均適應度、族群多樣性（未檢查時為 NaN）
+        return self.history[:self.generation].copy()
+
+    def info(self):
+        return {
+            'generations': self.generation,
+            'restarts': self.restarts,
+            'stop_reason': self.stop_reason,
+            'history': self.fitness_history(),
+        }
@@ -0,0 +1,223 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from equity import EQUITY_SAMPLES
+from hand_evaluator import evaluate_batch
+from Licensing import deal_batch
+from strategy_optimizer import ACTIONS, EV_MODELS, POSITIONS, STREETS, evaluate_streets, starting_stack
+from strategy_store import DEFAULT_CACHE_DIR, load_config, load_or_train, load_strategy
+
+# 每批同時進行的牌桌數（也是每個子種子的局數），固定後結果與 worker 數無關
+SIMULATION_CHUNK_SIZE = 20000
+# 每條街最多的加注次數，之後的加注視為跟注；全下不受限制（每人最多一次）
+MAX_RAISES_PER_STREET = 4
+CONFIDENCE_Z = 1.96
+
+FOLD, CALL, RAISE, ALL_IN = (ACTIONS.index(action) for action in ('fold', 'call', 'raise', 'all-in'))
+SMALL_BLIND_SEAT = POSITIONS.index('Small Blind')
+BIG_BLIND_SEAT = POSITIONS.index('Big Blind')
+# 翻牌前由 UTG 先行動、大盲最後；翻牌後由小盲先行動、按鈕最後
+PREFLOP_ORDER = [POSITIONS.index(position) for position in ('UTG', 'HighJack', 'CutOff', 'Button', 'Small Blind', 'Big Blind')]
+POSTFLOP_ORDER = [POSITIONS.index(position) for position in ('Small Blind', 'Big Blind', 'UTG', 'HighJack', 'CutOff', 'Button')]
+NUM_SEATS = len(POSITIONS)
+# 每條街輪到行動的次數上限：每次加注或全下都讓其他人再行動一輪
+MAX_TURNS_PER_STREET = NUM_SEATS * (MAX_RAISES_PER_STREET + NUM_SEATS + 2)
+
+
+def table_blinds(tables):
+    # 盲注是每個策略訓練時的設定，由決策表帶著；同一桌的座位必須使用相同的盲注
+    blinds = {(table.small_blind, table.big_blind) for table in tables}
+    if len(blinds) != 1:
+        raise ValueError(f"Decision tables use different blinds (small, big): {sorted(blinds)}")
+    return blinds.pop()
+
+
+def betting_round(tables, categories, street, stack, contributed, folded, street_bet, big_blind):
+    # 就地更新 stack、contributed、folded、street_bet；所有牌桌同時進行，最小加注為一個大盲
+    num_tables = len(stack)
+    order = PREFLOP_ORDER if street == 0 else POSTFLOP_ORDER
+    current_bet = street_bet.max(axis=1)
+    raises = np.zeros(num_tables, dtype=np.int64)
+    acted = np.zeros((num_tables, NUM_SEATS), dtype=bool)
+    idle_turns = 0
+    for turn in range(MAX_TURNS_PER_STREET):
+        seat = order[turn % NUM_SEATS]
+        # 只剩一人時不再行動；已行動且不需補齊下注的人也跳過
+        contested = (~folded).sum(axis=1) > 1
+        to_act = contested & ~folded[:, seat] & (stack[:, seat] > 0) & (~acted[:, seat] | (street_bet[:, seat] < current_bet))
+        rows = np.flatnonzero(to_act)
+        if not len(rows):
+            # 整圈沒有人需要行動時這條街結束
+            idle_turns += 1
+            if idle_turns >= NUM_SEATS:
+                break
+            continue
+        idle_turns = 0
+
+        seat_stack = stack[rows, seat]
+        to_call = current_bet[rows] - street_bet[rows, seat]
+        action, raise_size = tables[seat].lookup(seat, categories[rows, seat, street], seat_stack, contributed[rows].sum(axis=1))
+        # 不需跟注時棄牌改為過牌；達到加注上限時加注改為跟注
+        action = np.where((action == FOLD) & (to_call <= 0), CALL, action)
+        action = np.where((action == RAISE) & (raises[rows] >= MAX_RAISES_PER_STREET), CALL, action)
+
+        amount = np.select(
+            [action == CALL, action == RAISE, action == ALL_IN],
+            [np.minimum(to_call, seat_stack), np.minimum(to_call + np.maximum(raise_size, big_blind), seat_stack), seat_stack],
+            default=0.0,
+        )
+        folded[rows, seat] |= action == FOLD
+        stack[rows, seat] -= amount
+        contributed[rows, seat] += amount
+        street_bet[rows, seat] += amount
+        raised = street_bet[rows, seat] > current_bet[rows]
+        raises[rows[raised]] += 1
+        current_bet[rows] = np.maximum(current_bet[rows], street_bet[rows, seat])
+        acted[rows, seat] = True
+
+
+def settle(cards, contributed, folded):
+    # 依投入金額分層計算主池與邊池，每層由有資格的最強牌平分；回傳每個座位贏回的籌碼
+    num_tables = len(cards)
+    holes = cards[:, :2 * NUM_SEATS].reshape(num_tables, NUM_SEATS, 2)
+    board = np.broadcast_to(cards[:, None, 2 * NUM_SEATS:], (num_tables, NUM_SEATS, 5))
+    strengths = evaluate_batch(np.concatenate([holes, board], axis=2).reshape(-1, 7)).reshape(num_tables, NUM_SEATS)
+    strengths = np.where(folded, -1, strengths)
+
+    winnings = np.zeros_like(contributed)
+    levels = np.sort(contributed, axis=1)
+    previous = np.zeros(num_tables)
+    for j in range(NUM_SEATS):
+        level = levels[:, j]
+        layer = (np.minimum(contributed, level[:, None]) - np.minimum(contributed, previous[:, None])).sum(axis=1)
+        eligible = ~folded & (contributed >= level[:, None])
+        # 沒有未棄牌的玩家投入到這一層時（只有棄牌者的籌碼），交給未棄牌者中最強的牌
+        eligible |= ~eligible.any(axis=1, keepdims=True) & ~folded
+        eligible_strengths = np.where(eligible, strengths, -1)
+        winners = eligible & (eligible_strengths == eligible_strengths.max(axis=1, keepdims=True))
+        winnings += winners * (layer / winners.sum(axis=1))[:, None]
+        previous = level
+    return winnings
+
+
+def play_hands(tables, cards, stack_size=starting_stack):
+    # tables: 所有座位共用的 DecisionTable，或每個座位（依 POSITIONS 順序）一個；cards: (局, 2 * 座位數 + 5)
+    # stack_size 為起始籌碼（純量或可廣播到 (局, 座位)），回傳 (局, 座位) 的淨輸贏籌碼
+    if not isinstance(tables, (list, tuple)):
+        tables = [tables] * NUM_SEATS
+    small_blind, big_blind = table_blinds(tables)
+    cards = np.asarray(cards, dtype=np.int8)
+    num_tables = len(cards)
+    categories = evaluate_streets(cards, NUM_SEATS)
+    stack = np.broadcast_to(np.asarray(stack_size, dtype=float), (num_tables, NUM_SEATS)).copy()
+    contributed = np.zeros((num_tables, NUM_SEATS))
+    folded = np.zeros((num_tables, NUM_SEATS), dtype=bool)
+
+    for street in range(len(STREETS)):
+        street_bet = np.zeros((num_tables, NUM_SEATS))
+        if street == 0:
+            for seat, blind in ((SMALL_BLIND_SEAT, small_blind), (BIG_BLIND_SEAT, big_blind)):
+                street_bet[:, seat] = np.minimum(blind, stack[:, seat])
+            stack -= street_bet
+            contributed += street_bet
+        betting_round(tables, categories, street, stack, contributed, folded, street_bet, big_blind)
+
+    return settle(cards, contributed, folded) - contributed
+
+
+def _simulation_chunk(tables, entropy, chunk_index, num_hands, stack_size):
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(chunk_index,)))
+    return play_hands(tables, deal_batch(rng, num_hands, NUM_SEATS), stack_size)
+
+
+def simulate(tables, num_hands, seed=None, workers=1, chunk_size=SIMULATION_CHUNK_SIZE, stack_size=starting_stack):
+    # 依固定大小分塊發牌，每塊有自己的子種子；回傳 (局, 座位) 的淨輸贏籌碼
+    entropy = np.random.SeedSequence(seed).entropy
+    chunks = [(tables, entropy, index, min(chunk_size, num_hands - start), stack_size)
+              for index, start in enumerate(range(0, num_hands, chunk_size))]
+    if not chunks:
+        return np.empty((0, NUM_SEATS))
+    if workers <= 1:
+        return np.concatenate([_simulation_chunk(*chunk) for chunk in chunks])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return np.concatenate(list(executor.map(_simulation_chunk, *zip(*chunks))))
+
+
+def summarize(net, big_blind):
+    # 每個位置的 bb/100 與常態近似的 95% 信賴區間半寬；big_blind 為模擬時使用的大盲
+    per_100 = net / big_blind * 100
+    summary = {}
+    for seat, position in enumerate(POSITIONS):
+        values = per_100[:, seat]
+        summary[position] = {
+            'hands': len(values),
+            'bb_per_100': float(values.mean()) if len(values) else 0.0,
+            'confidence_interval': float(CONFIDENCE_Z * values.std(ddof=1) / np.sqrt(len(values))) if len(values) > 1 else float('inf'),
+        }
+    return summary
+
+
+def head_to_head(challenger, baseline, num_hands, seed=None, workers=1, chunk_size=SIMULATION_CHUNK_SIZE, stack_size=starting_stack):
+    # 挑戰者輪流坐在每個位置、其餘座位使用基準策略，回傳挑戰者在各位置的結果
+    _, big_blind = table_blinds([challenger, baseline])
+    results = {}
+    for seat, position in enumerate(POSITIONS):
+        tables = [baseline] * NUM_SEATS
+        tables[seat] = challenger
+        results[position] = summarize(simulate(tables, num_hands, seed, workers, chunk_size, stack_size), big_blind)[position]
+    return results
+
+
+def print_summary(summary, title):
+    print(title)
+    for position, result in summary.items():
+        print(f"  {position:<12} {result['bb_per_100']:>10.2f} bb/100  ± {result['confidence_interval']:.2f}  ({result['hands']:,} hands)")
+
+
+def load_policy(args, artifact):
+    if artifact:
+        return load_strategy(artifact)
+    return load_or_train(args.data_path, args.seed, args.workers, args.islands, args.cache_dir, args.ev_model, args.equity_samples,
+                         load_config(args.config))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score strategies by simulated chip results over 6-max self-play.")
+    parser.add_argument('data_path', nargs='?', default='Texas_Holdem/poker_games_detailed2.csv')
+    parser.add_argument('--artifact', help="Strategy artifact to play instead of the one trained on data_path")
+    parser.add_argument('--challenger', help="Strategy artifact to seat at each position against the baseline strategy")
+    parser.add_argument('--hands', type=int, default=100000)
+    parser.add_argument('--simulation-seed', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--islands', type=int, default=1)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--ev-model', choices=EV_MODELS, default='legacy')
+    parser.add_argument('--equity-samples', type=int, default=EQUITY_SAMPLES)
+    parser.add_argument('--config', help="JSON file of StrategyConfig values overriding the defaults; artifacts carry their own config")
+    args = parser.parse_args()
+
+    # 起始籌碼與盲注都使用基準策略訓練時的設定
+    policy = load_policy(args, args.artifact)
+    baseline = policy.decision_table
+    stack_size = policy.config.starting_stack
+    start = time.perf_counter()
+    if args.challenger:
+        summary = head_to_head(load_strategy(args.challenger).decision_table, baseline, args.hands, args.simulation_seed, args.workers,
+                               stack_size=stack_size)
+        title = f"Challenger {args.challenger} vs baseline"
+    else:
+        summary = summarize(simulate(baseline, args.hands, args.simulation_seed, args.workers, stack_size=stack_size), baseline.big_blind)
+        title = "Self-play"
+    elapsed = time.perf_counter() - start
+    print_summary(summary, title)
+    num_hands = args.hands * (len(POSITIONS) if args.challenger else 1)
+    print(f"{num_hands:,} hands in {elapsed:.1f} s ({num_hands / elapsed * 60:,.0f} hands/min)")
+
+
+if __name__ == '__main__':
+    main()
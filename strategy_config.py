@@ -0,0 +1,67 @@
+# 牌局與 GA 超參數的設定，只使用標準函式庫：介面與推薦路徑可以在載入 NumPy 與訓練模組之前匯入
+
+# 常量定義
+ACTIONS = ['fold', 'call', 'raise', 'all-in']
+GENES_PER_INDIVIDUAL = 40
+INITIAL_POPULATION_SIZE = 280
+NUM_GENERATIONS = 900
+CROSSOVER_RATE = 0.8
+MUTATION_RATE = 0.05
+small_blind_amount = 10
+big_blind_amount = 20
+# 以勝率估計期望值時，全下投入的籌碼
+starting_stack = 1000
+# 期望值模型：legacy 為隨機動作標籤下的牌型平均，equity 為依勝率計算的籌碼期望值
+# class-equity 同 equity，但翻牌前勝率以起手牌類別查 card_classes 的表格，不再抽樣
+EV_MODELS = ['legacy', 'equity', 'class-equity']
+# 每代直接保留到下一代的最佳個體數
+ELITE_COUNT = 2
+# 連續這麼多代最佳與平均適應度都沒有進步超過 MIN_FITNESS_DELTA 時提早停止，0 表示跑滿 NUM_GENERATIONS
+EARLY_STOPPING_PATIENCE = 50
+MIN_FITNESS_DELTA = 1e-6
+# 族群多樣性低於此值視為收斂，還有重啟次數時以菁英加新隨機族群重新開始，否則停止；0 表示不檢查
+MIN_DIVERSITY = 0.05
+MAX_RESTARTS = 2
+
+POSITIONS = ['Button', 'Small Blind', 'Big Blind', 'UTG', 'HighJack', 'CutOff']
+STREETS = [0, 3, 4, 5]
+
+
+class StrategyConfig:
+    # GA 與牌局的超參數，預設為上面的模組常數；透過 StrategyOptimizer(config=...) 傳入
+    def __init__(self, genes_per_individual=GENES_PER_INDIVIDUAL, initial_population_size=INITIAL_POPULATION_SIZE,
+                 num_generations=NUM_GENERATIONS, crossover_rate=CROSSOVER_RATE, mutation_rate=MUTATION_RATE,
+                 elite_count=ELITE_COUNT, early_stopping_patience=EARLY_STOPPING_PATIENCE, min_fitness_delta=MIN_FITNESS_DELTA,
+                 min_diversity=MIN_DIVERSITY, max_restarts=MAX_RESTARTS, small_blind_amount=small_blind_amount,
+                 big_blind_amount=big_blind_amount, starting_stack=starting_stack):
+        self.genes_per_individual = genes_per_individual
+        self.initial_population_size = initial_population_size
+        self.num_generations = num_generations
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.elite_count = elite_count
+        self.early_stopping_patience = early_stopping_patience
+        self.min_fitness_delta = min_fitness_delta
+        self.min_diversity = min_diversity
+        self.max_restarts = max_restarts
+        self.small_blind_amount = small_blind_amount
+        self.big_blind_amount = big_blind_amount
+        self.starting_stack = starting_stack
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, values):
+        # 忽略不認得的鍵，讓舊的超參數紀錄也能讀入
+        fields = cls().as_dict()
+        return cls(**{name: value for name, value in values.items() if name in fields})
+
+    def replace(self, **changes):
+        return StrategyConfig(**{**self.as_dict(), **changes})
+
+    def __eq__(self, other):
+        return isinstance(other, StrategyConfig) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return f"StrategyConfig({', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())})"
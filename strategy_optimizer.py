@@ -1,307 +1,631 @@
-import pandas as pd
+import copy
+import itertools
+import multiprocessing
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+
 import numpy as np
-import random
-
-# 常量定義
-ACTIONS = ['fold', 'call', 'raise', 'all-in']
-GENES_PER_INDIVIDUAL = 40
-INITIAL_POPULATION_SIZE = 280
-NUM_GENERATIONS = 900
-CROSSOVER_RATE = 0.8
-MUTATION_RATE = 0.05
-small_blind_amount = 10
-big_blind_amount = 20
-
-class StrategyOptimizer:
-    def __init__(self, file_path):
+
+from card_classes import load_tables, preflop_categories
+from decision_table import NUM_CATEGORIES
+from equity import EQUITY_SAMPLES, compute_equities
+from fitness_cache import FitnessCache, genome_hashes, zobrist_table
+from game_dataset import GameDataset, card_columns, is_game_dataset, read_csv_cards
+from hand_evaluator import evaluate_batch, hand_category
+from profiling import timed_stage
+from run_controller import RESTART, STOP, RunController
+# 牌局設定、超參數與推薦路徑搬到不依賴訓練模組的 strategy_config 與 strategy_policy，這裡一併匯出
+from strategy_config import (ACTIONS, CROSSOVER_RATE, EARLY_STOPPING_PATIENCE, ELITE_COUNT, EV_MODELS, GENES_PER_INDIVIDUAL,
+                             INITIAL_POPULATION_SIZE, MAX_RESTARTS, MIN_DIVERSITY, MIN_FITNESS_DELTA, MUTATION_RATE, NUM_GENERATIONS,
+                             POSITIONS, STREETS, StrategyConfig, big_blind_amount, small_blind_amount, starting_stack)
+from strategy_policy import GENE_ACTION, GENE_HAND_VALUE, StrategyPolicy, genome_to_strategy, strategy_to_genome
+
+# 適應度快取容量（個體數），0 表示不使用快取
+FITNESS_CACHE_SIZE = 0
+CARD_COLUMNS = card_columns(POSITIONS)
+# 每批評估的局數，讓記憶體用量與總局數無關
+HISTORY_BATCH_SIZE = 65536
+# 讀取資料檔時每次 ingest 的局數
+INGEST_CHUNK_SIZE = 262144
+# 平行訓練時 worker 回報進度、主行程檢查取消的間隔（秒）
+PROGRESS_INTERVAL = 0.1
+
+HAND_VALUE_WEIGHTS = {'fold': 0.1, 'call': 0.5, 'raise': 0.8, 'all-in': 1.0}
+POSITION_WEIGHTS = {
+    'Button': 1.8,
+    'Small Blind': 1.2,
+    'Big Blind': 1.0,
+    'CutOff': 0.9,
+    'HighJack': 0.7,
+    'UTG': 0.6,
+}
+
+
+def evaluate_streets(cards, num_players=len(POSITIONS)):
+    # 回傳 (局數, 玩家數, 街數) 的牌型類別
+    holes = cards[:, :2 * num_players].reshape(len(cards), num_players, 2)
+    board = cards[:, 2 * num_players:]
+    hand_values = np.empty((len(cards), num_players, len(STREETS)), dtype=np.int8)
+    for start in range(0, len(cards), HISTORY_BATCH_SIZE):
+        batch_holes = holes[start:start + HISTORY_BATCH_SIZE]
+        batch_board = board[start:start + HISTORY_BATCH_SIZE]
+        num_games = len(batch_holes)
+        # 翻牌前只看兩張手牌，以起手牌類別查表
+        hand_values[start:start + num_games, :, 0] = preflop_categories(batch_holes)
+        for j, num_cards in enumerate(STREETS[1:], 1):
+            shared = np.broadcast_to(batch_board[:, None, :num_cards], (num_games, num_players, num_cards))
+            hands = np.concatenate([batch_holes, shared], axis=2).reshape(-1, 2 + num_cards)
+            hand_values[start:start + num_games, :, j] = hand_category(evaluate_batch(hands)).reshape(num_games, num_players)
+    return hand_values
+
+
+class GenerationBuffers:
+    # 兩組族群緩衝區輪流使用：新世代寫入另一組，讀取中的上一代不會被改寫
+    # random、mutation_mask、swap 與 swap_delta 是突變與交叉的暫存區，每個世代重複使用
+    def __init__(self, size, num_genes):
+        self.populations = [np.empty((size, num_genes, 2), dtype=np.int8) for _ in range(2)]
+        self.hashes = [np.empty(size, dtype=np.uint64) for _ in range(2)]
+        self.random = np.empty((size, num_genes))
+        self.mutation_mask = np.empty((size, num_genes), dtype=bool)
+        self.swap = np.empty((size // 2, num_genes, 2), dtype=np.int8)
+        self.swap_delta = np.empty((size // 2, num_genes, 2), dtype=np.int8)
+        self.current = 1
+
+    def next(self):
+        self.current ^= 1
+        return self.populations[self.current], self.hashes[self.current], self
+
+
+_crossover_tables = {}
+
+
+def crossover_table(num_genes, num_points=2):
+    # 每一列是一組排序後交叉點的交換遮罩 (基因數, 欄位數)：基因前方的交叉點數為奇數時來自另一個父代
+    # 交換的基因為 -1（所有位元為 1），其餘為 0，可以直接與基因做位元運算；最後一列全部為 0，給不進行交叉的配對使用
+    key = (num_genes, num_points)
+    if key not in _crossover_tables:
+        points = np.array(list(itertools.combinations(range(num_genes), num_points)), dtype=np.intp).reshape(-1, num_points)
+        swap = np.zeros((len(points) + 1, num_genes), dtype=bool)
+        genes = np.arange(num_genes)
+        for column in range(num_points):
+            swap[:-1] ^= genes[None, :] >= points[:, column, None]
+        _crossover_tables[key] = np.repeat(-swap.astype(np.int8)[:, :, None], 2, axis=2)
+    return _crossover_tables[key]
+
+
+_worker_optimizer = None
+_worker_stop_event = None
+_worker_progress_queue = None
+_worker_progress_time = 0.0
+
+
+def _init_worker(tables, stop_event=None, progress_queue=None):
+    # stop_event 與 progress_queue 在建立 worker 時繼承，取消與進度不必等到整個位置訓練完成
+    global _worker_optimizer, _worker_stop_event, _worker_progress_queue
+    _worker_stop_event = stop_event
+    _worker_progress_queue = progress_queue
+    _worker_optimizer = StrategyOptimizer(seed=tables['seed_entropy'], fitness_cache_size=tables['fitness_cache_size'], config=tables['config'])
+    _worker_optimizer.fitness_factors_by_position = tables['fitness_factors_by_position']
+    _worker_optimizer.hand_value_counts_by_position = tables['hand_value_counts_by_position']
+    _worker_optimizer.position_genomes = tables['position_genomes']
+
+
+def _worker_progress(position, generation, best_fitness):
+    # 每個世代都會呼叫，限制送回主行程的頻率
+    global _worker_progress_time
+    now = time.perf_counter()
+    if now - _worker_progress_time >= PROGRESS_INTERVAL:
+        _worker_progress_time = now
+        _worker_progress_queue.put((position, generation, best_fitness))
+
+
+def _optimize_position_task(position, island, warm_start=False):
+    progress = _worker_progress if _worker_progress_queue is not None else None
+    should_stop = _worker_stop_event.is_set if _worker_stop_event is not None else None
+    return _worker_optimizer.optimize_position(position, island, progress, should_stop, warm_start)
+
+
+def _forward_progress(progress_queue, progress):
+    while True:
+        try:
+            position, generation, best_fitness = progress_queue.get_nowait()
+        except queue.Empty:
+            return
+        progress(position, generation, best_fitness)
+
+
+class StrategyOptimizer(StrategyPolicy):
+    def __init__(self, file_path=None, seed=None, ev_model='legacy', equity_samples=EQUITY_SAMPLES, workers=1,
+                 fitness_cache_size=FITNESS_CACHE_SIZE, stage_timer=None, config=None):
+        if ev_model not in EV_MODELS:
+            raise ValueError(f"Unknown EV model {ev_model}, expected one of {EV_MODELS}")
+        super().__init__(config)
         self.file_path = file_path
-        self.data = pd.read_csv(file_path)
-        self.historical_data_by_position = self.create_historical_data()
+        self.seed = seed
+        self.ev_model = ev_model
+        self.equity_samples = equity_samples
+        self.equity_ev_by_position = None
+        self.workers = workers
+        self.fitness_cache_size = fitness_cache_size
+        # profiling.StageTimer，記錄各階段（與各位置）的時間；None 時不記錄
+        self.stage_timer = stage_timer
+        self.position_run_info = {}
+        self.seed_entropy = np.random.SeedSequence(seed).entropy
+        self.rng = np.random.default_rng(np.random.SeedSequence(self.seed_entropy, spawn_key=(0,)))
+        self.equity_seed = np.random.SeedSequence(self.seed_entropy, spawn_key=(2,))
+        # 沒有資料檔時由呼叫端自行填入表格（例如平行 worker），或之後以 ingest 加入牌局
+        self.reset_statistics()
+        if file_path is None:
+            return
+        self.ingest_file(file_path)
+
+    def reset_statistics(self):
+        # 期望值只依賴這些累計量，新牌局以 O(塊大小) 的成本加入
+        # action_counts: (位置, 動作標籤, 街, 牌型類別) 的紀錄數
+        self.num_games = 0
+        self.action_counts = np.zeros((len(POSITIONS), len(ACTIONS), len(STREETS), NUM_CATEGORIES), dtype=np.int64)
+        # 加注倍數（以大盲為單位）的總和，大盲改變時不需重新 ingest
+        self.raise_multiple_totals = np.zeros(len(POSITIONS), dtype=np.int64)
+        self.raise_counts = np.zeros(len(POSITIONS), dtype=np.int64)
+        # equity 模型：(位置, 街, 牌型類別) 的勝率總和
+        self.equity_sums = np.zeros((len(POSITIONS), len(STREETS), NUM_CATEGORIES))
+
+    def iter_card_chunks(self, file_path, chunk_size=INGEST_CHUNK_SIZE, start=0):
+        # 二進位資料集從 memmap 分塊複製，CSV 則分塊解碼，記憶體用量只與塊大小有關
+        if is_game_dataset(file_path):
+            return GameDataset(file_path).iter_seat_chunks(POSITIONS, chunk_size, start)
+        return read_csv_cards(file_path, POSITIONS, chunk_size, start)
+
+    def ingest_file(self, file_path, start=0, chunk_size=INGEST_CHUNK_SIZE):
+        # start 為略過的局數；傳入 self.num_games 即可只讀取檔案新附加的牌局
+        num_games = 0
+        for cards in self.iter_card_chunks(file_path, chunk_size, start):
+            num_games += self.ingest(cards, update=False)
+        self.file_path = file_path
+        self.update_tables()
+        return num_games
+
+    def stage(self, name, position=None):
+        return self.stage_timer.stage(name, position) if self.stage_timer else nullcontext()
+
+    @timed_stage('ingest')
+    def ingest(self, cards, update=True):
+        # cards: (局數, len(CARD_COLUMNS)) 牌編碼；累加統計量後重新計算期望值與適應度表格
+        cards = np.asarray(cards, dtype=np.int8)
+        with self.stage('evaluate_streets'):
+            hand_values = evaluate_streets(cards)
+        actions = self.rng.integers(len(ACTIONS), size=hand_values.shape, dtype=np.int8)
+        raise_multipliers = self.rng.integers(1, 4, size=hand_values.shape, dtype=np.int16)
+
+        # 以 (位置, 動作, 街, 類別) 的扁平索引一次計數
+        index = np.ravel_multi_index(
+            (np.arange(len(POSITIONS))[:, None], actions, np.arange(len(STREETS)), hand_values), self.action_counts.shape)
+        self.action_counts += np.bincount(index.ravel(), minlength=self.action_counts.size).reshape(self.action_counts.shape)
+        is_raise = actions == ACTIONS.index('raise')
+        self.raise_multiple_totals += (raise_multipliers * is_raise).sum(axis=(0, 2))
+        self.raise_counts += is_raise.sum(axis=(0, 2))
+
+        if self.ev_model != 'legacy':
+            with self.stage('compute_equities'):
+                equities = self.compute_equities(cards)
+            index = np.ravel_multi_index((np.arange(len(POSITIONS))[:, None], np.arange(len(STREETS)), hand_values), self.equity_sums.shape)
+            self.equity_sums += np.bincount(index.ravel(), weights=equities.ravel(), minlength=self.equity_sums.size).reshape(self.equity_sums.shape)
+
+        self.num_games += len(cards)
+        if update:
+            self.update_tables()
+        return len(cards)
+
+    def compute_equities(self, cards):
+        # (局數, 位置, 街) 的勝率
+        if self.ev_model == 'equity':
+            return compute_equities(cards, len(POSITIONS), self.equity_samples, self.equity_seed, self.workers, offset=self.num_games)
+        # class-equity：翻牌前以起手牌類別查對 5 名隨機對手的勝率；資料中的對手手牌是隨機的，
+        # 各 (位置, 牌型類別) 的平均勝率與抽樣的期望相同，只有翻牌後的街需要抽樣
+        holes = cards[:, :2 * len(POSITIONS)].reshape(-1, 2)
+        preflop = load_tables().preflop_equities(holes, len(POSITIONS) - 1).reshape(len(cards), len(POSITIONS), 1)
+        postflop = compute_equities(cards, len(POSITIONS), self.equity_samples, self.equity_seed, self.workers, offset=self.num_games,
+                                    streets=STREETS[1:])
+        return np.concatenate([preflop, postflop], axis=2)
+
+    @timed_stage('update_tables')
+    def update_tables(self):
+        # 由累計量重新計算所有衍生表格，成本與牌局數無關
+        if self.ev_model != 'legacy':
+            self.equity_ev_by_position = self.calculate_equity_expected_values()
         self.expected_values_by_position = self.calculate_expected_values()
-        self.position_strategies = {}
-
-    def create_historical_data(self):
-        historical_data_by_position = {
-            'Button': {'fold': [], 'call': [], 'raise': [], 'all-in': []},
-            'Small Blind': {'fold': [], 'call': [], 'raise': [], 'all-in': []},
-            'Big Blind': {'fold': [], 'call': [], 'raise': [], 'all-in': []},
-            'UTG': {'fold': [], 'call': [], 'raise': [], 'all-in': []},
-            'HighJack': {'fold': [], 'call': [], 'raise': [], 'all-in': []},
-            'CutOff': {'fold': [], 'call': [], 'raise': [], 'all-in': []}
+        self.fitness_factors_by_position = {position: self.fitness_factors_for_position(position) for position in POSITIONS}
+        self.hand_value_counts_by_position = self.count_hand_values()
+
+    def mean_raise_size(self, position):
+        p = POSITIONS.index(position)
+        if self.raise_counts[p]:
+            return float(self.raise_multiple_totals[p] * self.config.big_blind_amount) / self.raise_counts[p]
+        return self.config.big_blind_amount
+
+    def equity_action_values(self, equities, position):
+        # 由勝率估計各動作的籌碼期望值，回傳 (..., 動作)
+        # 跟注：贏得目前底池或輸掉跟注額；加注、全下：假設一名對手跟注
+        config = self.config
+        posted = {'Small Blind': config.small_blind_amount, 'Big Blind': config.big_blind_amount}.get(position, 0)
+        pot_size = config.small_blind_amount + config.big_blind_amount
+        costs = {
+            'call': config.big_blind_amount - posted,
+            'raise': max(self.mean_raise_size(position) - posted, 0),
+            'all-in': config.starting_stack - posted,
         }
-        raise_sizes_by_position = {position: [] for position in historical_data_by_position.keys()}
-
-        for index, row in self.data.iterrows():
-            for position in historical_data_by_position.keys():
-                hand1 = row[f'{position} Hand 1']
-                hand2 = row[f'{position} Hand 2']
-                for num_cards in [0, 3, 4, 5]:
-                    community_cards = [row[f'Community Card {i+1}'] for i in range(num_cards)]
-                    hand_value = self.calculate_hand_value([hand1, hand2] + community_cards)
-                    action = random.choice(ACTIONS)
-                    historical_data_by_position[position][action].append((num_cards, hand_value))
-
-                    if action == 'raise':
-                        raise_size = random.randint(1, 3) * big_blind_amount
-                        raise_sizes_by_position[position].append(raise_size)
-
-        for position in historical_data_by_position:
-            for action in historical_data_by_position[position]:
-                if historical_data_by_position[position][action]:
-                    historical_data_by_position[position][action] = np.array(historical_data_by_position[position][action])
-                else:
-                    historical_data_by_position[position][action] = np.array([(0, 0)])
-
-        self.raise_sizes_by_position = raise_sizes_by_position
-
-        return historical_data_by_position
-
-    def calculate_hand_value(self, cards):
-        ranks = '23456789TJQKA'
-        suits = 'CDHS'
-
-        def card_value(card):
-            try:
-                rank, suit = card.split(' of ')
-                suit = suit[0]
-                if rank == '10':
-                    rank = 'T'
-                if rank not in ranks or suit not in suits:
-                    raise ValueError(f"Invalid card format: {card}")
-                return ranks.index(rank), suits.index(suit)
-            except ValueError:
-                raise ValueError(f"Invalid card format: {card}")
-
-        values = sorted([card_value(card) for card in cards], reverse=True)
-        hand_ranks = [value[0] for value in values]
-        hand_suits = [value[1] for value in values]
-
-        is_flush = len(set(hand_suits)) == 1
-        is_straight = all(hand_ranks[i] - hand_ranks[i+1] == 1 for i in range(len(hand_ranks) - 1))
-        rank_counts = {rank: hand_ranks.count(rank) for rank in set(hand_ranks)}
-        if is_flush and is_straight:
-            return 8
-        elif 4 in rank_counts.values():
-            return 7
-        elif 3 in rank_counts.values() and 2 in rank_counts.values():
-            return 6
-        elif is_flush:
-            return 5
-        elif is_straight:
-            return 4
-        elif 3 in rank_counts.values():
-            return 3
-        elif list(rank_counts.values()).count(2) == 2:
-            return 2
-        elif 2 in rank_counts.values():
-            return 1
-        else:
-            return 0
+        values = np.zeros(np.shape(equities) + (len(ACTIONS),))
+        for a, action in enumerate(ACTIONS):
+            if action == 'fold':
+                continue
+            won = pot_size if action == 'call' else pot_size + costs[action]
+            values[..., a] = equities * won - (1 - equities) * costs[action]
+        return values
+
+    def calculate_equity_expected_values(self):
+        # 每個位置的 (動作, 牌型類別) 平均籌碼期望值，取代隨機動作標籤的平均
+        # 期望值是勝率的線性函數，平均勝率代入即為期望值的平均
+        tables = {}
+        for p, position in enumerate(POSITIONS):
+            counts = self.action_counts[p].sum(axis=(0, 1))
+            mean_equities = self.equity_sums[p].sum(axis=0) / np.maximum(counts, 1)
+            values = self.equity_action_values(mean_equities, position)
+            tables[position] = np.where(counts > 0, values.T, 0.0)
+        return tables
 
     def calculate_expected_values(self):
         expected_values_by_position = {}
-        for position in self.historical_data_by_position:
+        for p, position in enumerate(POSITIONS):
             expected_values_by_position[position] = {}
-            for action in ACTIONS:
-                values_by_num_cards = {}
-                for num_cards in range(3, 6):
-                    values = [value for nc, value in self.historical_data_by_position[position][action] if nc == num_cards]
-                    if values:
-                        values_by_num_cards[num_cards] = np.mean(values)
-                    else:
-                        values_by_num_cards[num_cards] = 0
-                expected_values_by_position[position][action] = values_by_num_cards
-
-            if self.raise_sizes_by_position[position]:
-                expected_values_by_position[position]['raise_size'] = np.mean(self.raise_sizes_by_position[position])
+            if self.ev_model != 'legacy':
+                # 各街的平均籌碼期望值
+                mean_equities = self.equity_sums[p].sum(axis=1) / max(self.num_games, 1)
+                action_values = self.equity_action_values(mean_equities, position)
+                for a, action in enumerate(ACTIONS):
+                    expected_values_by_position[position][action] = {
+                        num_cards: action_values[STREETS.index(num_cards), a] for num_cards in range(3, 6)
+                    }
             else:
-                expected_values_by_position[position]['raise_size'] = big_blind_amount
+                # 各街紀錄的平均手牌價值
+                categories = np.arange(NUM_CATEGORIES)
+                for a, action in enumerate(ACTIONS):
+                    values_by_num_cards = {}
+                    for num_cards in range(3, 6):
+                        counts = self.action_counts[p, a, STREETS.index(num_cards)]
+                        if counts.sum():
+                            values_by_num_cards[num_cards] = (counts * categories).sum() / counts.sum()
+                        else:
+                            values_by_num_cards[num_cards] = 0
+                    expected_values_by_position[position][action] = values_by_num_cards
+
+            expected_values_by_position[position]['raise_size'] = self.mean_raise_size(position)
 
         return expected_values_by_position
 
-    def generate_individual_for_position(self, position):
-        individual = []
-        for _ in range(GENES_PER_INDIVIDUAL):
-            action = random.choice(ACTIONS)
-            # 從歷史數據中選擇一個隨機的手牌價值
-            hand_value = random.choice(self.historical_data_by_position[position][action])[-1]
-            gene = {
-                'position': position,
-                'action': action,
-                'hand_value': hand_value
-            }
-            individual.append(gene)
-        return individual
-
-    def initialize_population_for_position(self, position, size):
-        population = []
-        for _ in range(size):
-            population.append(self.generate_individual_for_position(position))
+    def with_config(self, config):
+        # 複製已 ingest 的統計量，只重算與設定有關的表格；用於比較不同超參數
+        # 累計量與標籤亂數產生器各自一份，之後 ingest 到其中一個不會改變另一個
+        optimizer = copy.copy(self)
+        optimizer.config = config
+        optimizer.action_counts = self.action_counts.copy()
+        optimizer.raise_multiple_totals = self.raise_multiple_totals.copy()
+        optimizer.raise_counts = self.raise_counts.copy()
+        optimizer.equity_sums = self.equity_sums.copy()
+        optimizer.rng = copy.deepcopy(self.rng)
+        optimizer.position_genomes = {}
+        optimizer.position_strategies = {}
+        optimizer.position_run_info = {}
+        optimizer.decision_table = None
+        optimizer.update_tables()
+        return optimizer
+
+    def position_rng(self, position, island=0):
+        # 每個位置（與島嶼）有獨立且可重現的亂數流
+        seed = np.random.SeedSequence(self.seed_entropy, spawn_key=(1, POSITIONS.index(position), island))
+        return np.random.default_rng(seed)
+
+    def count_hand_values(self):
+        # 每個 (位置, 動作) 的手牌價值分布，初始化族群時只需要這個小表格
+        counts_by_position = {}
+        for p, position in enumerate(POSITIONS):
+            counts_by_position[position] = {}
+            for a, action in enumerate(ACTIONS):
+                counts = self.action_counts[p, a].sum(axis=0)
+                if not counts.any():
+                    # 沒有紀錄的動作視為牌型類別 0
+                    counts[0] = 1
+                counts_by_position[position][action] = counts
+        return counts_by_position
+
+    def generate_individual_for_position(self, position, rng):
+        return self.initialize_population_for_position(position, 1, rng)[0]
+
+    def initialize_population_for_position(self, position, size, rng):
+        actions = rng.integers(len(ACTIONS), size=(size, self.config.genes_per_individual), dtype=np.int8)
+        hand_values = np.empty_like(actions)
+        for a, action in enumerate(ACTIONS):
+            # 依歷史數據的分布選擇隨機的手牌價值
+            cumulative = np.cumsum(self.hand_value_counts_by_position[position][action])
+            mask = actions == a
+            hand_values[mask] = np.searchsorted(cumulative, rng.integers(cumulative[-1], size=mask.sum()), side='right')
+        return np.stack([actions, hand_values], axis=-1)
+
+    def warm_start_population_for_position(self, position, size, rng):
+        # 以目前的策略為起點：一半是它與它的突變版本，其餘隨機以保持多樣性；沒有策略時等同隨機初始化
+        population = self.initialize_population_for_position(position, size, rng)
+        genome = self.position_genomes.get(position)
+        if genome is None:
+            return population
+        num_seeded = size // 2
+        population[:num_seeded] = genome
+        self.mutate(population[1:num_seeded], self.config.mutation_rate, rng)
         return population
 
-    def evaluate_fitness_for_position(self, strategy, position, small_blind=10, big_blind=20):
-        position_weights = {
-            'Button': 1.8,
-            'Small Blind': 1.2,
-            'Big Blind': 1.0,
-            'CutOff': 0.9,
-            'HighJack': 0.7,
-            'UTG': 0.6,
-        }
+    def fitness_factors_for_position(self, position, small_blind=None, big_blind=None):
+        # 回傳 (動作, 牌型類別) 的適應度係數，基因的適應度為對應格子的值；盲注預設取自 config
+        if self.ev_model != 'legacy':
+            return self.equity_ev_by_position[position]
 
+        small_blind = self.config.small_blind_amount if small_blind is None else small_blind
+        big_blind = self.config.big_blind_amount if big_blind is None else big_blind
+
+        # legacy：平均期望值 × 手牌權重 × 底池 × 位置權重 × 手牌價值
         pot_size = small_blind + big_blind
+        if position == 'Small Blind':
+            pot_size += small_blind
+        elif position == 'Big Blind':
+            pot_size += big_blind
 
-        total_ev = 0
-        for rule in strategy:
-            action = rule['action']
-            hand_value = rule['hand_value']
+        factors = np.empty(len(ACTIONS))
+        for a, action in enumerate(ACTIONS):
             action_values = self.expected_values_by_position[position][action].values()
             action_value = sum(action_values) / len(action_values)
+            factors[a] = action_value * HAND_VALUE_WEIGHTS[action] * pot_size
+        factors *= POSITION_WEIGHTS[position]
+        return factors[:, None] * np.arange(NUM_CATEGORIES)
 
-            hand_value_weight = 1.0
-            if action == 'fold':
-                hand_value_weight = 0.1
-            elif action == 'call':
-                hand_value_weight = 0.5
-            elif action == 'raise':
-                hand_value_weight = 0.8
-            elif action == 'all-in':
-                hand_value_weight = 1.0
-
-            if position == 'Button':
-                action_value *= pot_size
-            elif position == 'Small Blind':
-                action_value *= (pot_size + small_blind)
-            elif position == 'Big Blind':
-                action_value *= (pot_size + big_blind)
-            else:
-                action_value *= pot_size
-
-            action_value *= hand_value_weight * hand_value
-
-            total_ev += action_value
-
-        total_ev *= position_weights[position]
-
-        return total_ev
-
-    def select_parents(self, population, fitness_scores, num_parents):
-        selected_parents = random.choices(population, weights=fitness_scores, k=num_parents)
-        return selected_parents
-
-    def crossover(self, parent1, parent2, num_points=2):
-        if random.random() > CROSSOVER_RATE:
-            # 不進行交叉，直接返回原始父代
-            return parent1, parent2
+    def evaluate_population_fitness(self, population, factors):
+        return factors[population[..., GENE_ACTION], population[..., GENE_HAND_VALUE]].sum(axis=1)
 
-        # 選擇 num_points 個隨機交叉點並排序
-        crossover_points = sorted(random.sample(range(GENES_PER_INDIVIDUAL), num_points))
-
-        # 初始化子代
-        child1, child2 = [], []
-
-        last_point = 0
-        # 交替交換片段
-        for i, point in enumerate(crossover_points):
-            if i % 2 == 0:
-                child1.extend(parent1[last_point:point])
-                child2.extend(parent2[last_point:point])
-            else:
-                child1.extend(parent2[last_point:point])
-                child2.extend(parent1[last_point:point])
-            last_point = point
-
-        # 添加最後一段
-        if num_points % 2 == 0:
-            child1.extend(parent1[last_point:])
-            child2.extend(parent2[last_point:])
+    def evaluate_fitness_for_position(self, strategy, position, small_blind=None, big_blind=None):
+        genome = strategy if isinstance(strategy, np.ndarray) else strategy_to_genome(strategy)
+        if small_blind in (None, self.config.small_blind_amount) and big_blind in (None, self.config.big_blind_amount):
+            factors = self.fitness_factors_by_position[position]
         else:
-            child1.extend(parent2[last_point:])
-            child2.extend(parent1[last_point:])
-
-        return child1, child2
+            factors = self.fitness_factors_for_position(position, small_blind, big_blind)
+        return float(self.evaluate_population_fitness(genome[None], factors)[0])
+
+    def select_parent_indices(self, fitness_scores, num_parents, rng):
+        # 期望值可能為負，此時平移到最小值為 0 再做輪盤選擇
+        weights = fitness_scores - min(fitness_scores.min(), 0)
+        total = weights.sum()
+        probabilities = weights / total if total > 0 else None
+        return rng.choice(len(fitness_scores), size=num_parents, p=probabilities)
+
+    def select_parents(self, population, fitness_scores, num_parents, rng):
+        return population[self.select_parent_indices(fitness_scores, num_parents, rng)]
+
+    def crossover_mask(self, num_pairs, rng, num_points=2, crossover_rate=1.0, out=None):
+        # 直接從交叉點組合表抽出每對的交換遮罩，不為了選交叉點而排序整列亂數
+        # 不進行交叉的配對指向最後一列（全部為 0）；out 為可重用的 (配對數, 基因數, 欄位數) 緩衝區
+        table = crossover_table(self.config.genes_per_individual, num_points)
+        rows = rng.integers(len(table) - 1, size=num_pairs)
+        if crossover_rate < 1:
+            rows[rng.random(num_pairs) >= crossover_rate] = len(table) - 1
+        if out is None:
+            return table[rows]
+        return np.take(table, rows, axis=0, out=out[:num_pairs], mode='clip')
+
+    def crossover(self, parent1, parent2, rng, num_points=2, crossover_rate=None):
+        # parent1、parent2 為成對的父代陣列 (配對數, 基因數, 欄位數)；crossover_rate 預設取自 config
+        crossover_rate = self.config.crossover_rate if crossover_rate is None else crossover_rate
+        swap = self.crossover_mask(len(parent1), rng, num_points, crossover_rate) != 0
+        return np.where(swap, parent2, parent1), np.where(swap, parent1, parent2)
+
+    def mutate(self, population, mutation_rate, rng, hashes=None, scratch=None, mask=None):
+        # 直接改寫傳入的族群（呼叫端保證它是新世代自己的陣列）；scratch、mask 為可重用的亂數與遮罩緩衝區
+        actions = population[..., GENE_ACTION]
+        if scratch is None:
+            draws = rng.random(actions.shape)
+        else:
+            draws = rng.random(out=scratch[:len(population)])
+        mask = np.less(draws, mutation_rate, out=None if mask is None else mask[:len(population)])
+        new_actions = rng.integers(len(ACTIONS), size=np.count_nonzero(mask), dtype=np.int8)
+        if hashes is not None:
+            # 增量更新雜湊：XOR 掉舊基因、XOR 上新基因
+            rows, genes = np.nonzero(mask)
+            hand_values = population[rows, genes, GENE_HAND_VALUE]
+            table = zobrist_table(population.shape[1])
+            np.bitwise_xor.at(hashes, rows, table[genes, actions[mask], hand_values] ^ table[genes, new_actions, hand_values])
+        actions[mask] = new_actions
+        return population
 
-    def mutate(self, individual, mutation_rate):
-        for gene in individual:
-            if random.random() < mutation_rate:
-                gene['action'] = random.choice(ACTIONS)
-        return individual
+    def generation_buffers(self, size):
+        return GenerationBuffers(size, self.config.genes_per_individual)
 
-    def create_new_population_for_position(self, population, position, fitness_scores, mutation_rate, crossover_rate):
-        new_population = []
+    def select_new_population(self, population, fitness_scores, rng, hashes=None, out=None):
+        # 選出的父代複製到新陣列（out 為 GenerationBuffers.next() 時寫入其中），之後的交叉與突變只改寫這份複本
         num_parents = len(population) // 2 * 2
-        parents = self.select_parents(population, fitness_scores, num_parents)
-        for i in range(0, num_parents, 2):
-            parent1, parent2 = parents[i], parents[i + 1]
-            if random.random() < crossover_rate:
-                child1, child2 = self.crossover(parent1, parent2)
-            else:
-                child1, child2 = parent1, parent2
-            new_population.append(self.mutate(child1, mutation_rate))
-            new_population.append(self.mutate(child2, mutation_rate))
+        parent_indices = self.select_parent_indices(fitness_scores, num_parents, rng)
+        if out is None:
+            return population[parent_indices], (hashes[parent_indices] if hashes is not None else None)
+        population_buffer, hash_buffer, _ = out
+        new_population = np.take(population, parent_indices, axis=0, out=population_buffer[:num_parents], mode='clip')
+        new_hashes = np.take(hashes, parent_indices, out=hash_buffer[:num_parents], mode='clip') if hashes is not None else None
+        return new_population, new_hashes
+
+    def crossover_children(self, new_population, crossover_rate, rng, hashes=None, buffers=None):
+        # 父代是獨立抽出的，前半與後半的第 i 個個體為一對；兩半都是連續的記憶體，就地交換時不需要暫存陣列
+        # buffers 為 GenerationBuffers 時使用其中的遮罩與暫存區
+        half = len(new_population) // 2
+        child1, child2 = new_population[:half], new_population[half:2 * half]
+        swap = self.crossover_mask(half, rng, crossover_rate=crossover_rate, out=buffers.swap if buffers else None)
+        if hashes is not None:
+            # 兩個子代交換的基因相同，雜湊的變化量也相同
+            pair_rows, genes = np.nonzero(swap[:, :, GENE_ACTION])
+            genes1 = child1[pair_rows, genes]
+            genes2 = child2[pair_rows, genes]
+            table = zobrist_table(new_population.shape[1])
+            delta = table[genes, genes1[:, GENE_ACTION], genes1[:, GENE_HAND_VALUE]] ^ table[genes, genes2[:, GENE_ACTION], genes2[:, GENE_HAND_VALUE]]
+            np.bitwise_xor.at(hashes[:half], pair_rows, delta)
+            np.bitwise_xor.at(hashes[half:2 * half], pair_rows, delta)
+        # delta = (child1 ^ child2) & swap，兩個子代各 XOR 一次 delta 即完成交換
+        delta = np.bitwise_xor(child1, child2, out=buffers.swap_delta[:half] if buffers else None)
+        np.bitwise_and(delta, swap, out=delta)
+        np.bitwise_xor(child1, delta, out=child1)
+        np.bitwise_xor(child2, delta, out=child2)
         return new_population
 
-    def optimize_strategy(self):
-        positions = ['Button', 'Small Blind', 'Big Blind', 'UTG', 'HighJack', 'CutOff']
-        for position in positions:
-            print(f"Optimizing strategy for {position}")
-            population = self.initialize_population_for_position(position, INITIAL_POPULATION_SIZE)
-            for generation in range(NUM_GENERATIONS):
-                fitness_scores = [self.evaluate_fitness_for_position(individual, position) for individual in population]
-                population = self.create_new_population_for_position(population, position, fitness_scores, MUTATION_RATE, CROSSOVER_RATE)
-            best_strategy = population[fitness_scores.index(max(fitness_scores))]
-            self.position_strategies[position] = best_strategy
-
-    def get_best_strategies(self):
-        return self.position_strategies
-
-    def recommend_action(self, position, hand, community_cards, initial_funds, remaining_funds, pot_size):
-        if position not in self.position_strategies:
-            raise ValueError(f"Position {position} not found in strategies.")
-
-        initial_funds = float(initial_funds)
-        remaining_funds = float(remaining_funds)
-        pot_size = float(pot_size)
-
-        hand = [card for card in hand if ' of ' in card and card.split(' of ')[0] in '23456789TJQKA' and card.split(' of ')[1][0] in 'CDHS']
-        community_cards = [card for card in community_cards if ' of ' in card and card.split(' of ')[0] in '23456789TJQKA' and card.split(' of ')[1][0] in 'CDHS']
-        hand_value = self.calculate_hand_value(hand + community_cards)
-
-        best_strategy = self.position_strategies[position]
-        action_values = {action: 0 for action in ACTIONS}
-        raise_sizes = []
-
-        for gene in best_strategy:
-            if gene['hand_value'] == hand_value:
-                action_values[gene['action']] += 1
-
-                if gene['action'] == 'raise':
-                    raise_size = self.expected_values_by_position[position]['raise_size']
-                    raise_sizes.append(raise_size)
-
-        if remaining_funds < big_blind_amount:
-            if hand_value > 3:
-                recommended_action = 'all-in'
-            else:
-                recommended_action = 'fold'
-        elif remaining_funds <= small_blind_amount * 2:
-            if hand_value > 2:
-                recommended_action = 'all-in'
-            else:
-                recommended_action = 'fold'
+    def create_new_population_for_position(self, population, position, fitness_scores, mutation_rate, crossover_rate, rng, hashes=None, out=None,
+                                           elites=None):
+        # 回傳 (新族群, 新雜湊)；hashes 為 None 時不追蹤雜湊
+        # out 為 GenerationBuffers.next() 的緩衝區時，新世代與暫存遮罩都使用其中的陣列而不另外配置
+        # elites 為上一代菁英的索引，原封不動地放在新族群的最前面
+        new_population, new_hashes = self.select_new_population(population, fitness_scores, rng, hashes, out)
+        buffers = out[2] if out is not None else None
+        self.crossover_children(new_population, crossover_rate, rng, new_hashes, buffers)
+        self.mutate(new_population, mutation_rate, rng, new_hashes, buffers.random if buffers else None,
+                    buffers.mutation_mask if buffers else None)
+        if elites is not None and len(elites):
+            new_population[:len(elites)] = population[elites]
+            if new_hashes is not None:
+                new_hashes[:len(elites)] = hashes[elites]
+        return new_population, new_hashes
+
+    def restart_population_for_position(self, population, position, rng, hashes=None, elites=None):
+        # 族群收斂時重新隨機初始化，只保留菁英
+        new_population = self.initialize_population_for_position(position, len(population), rng)
+        if elites is not None and len(elites):
+            new_population[:len(elites)] = population[elites]
+        return new_population, (genome_hashes(new_population) if hashes is not None else None)
+
+    def run_controller(self):
+        config = self.config
+        return RunController(config.num_generations, config.elite_count, config.early_stopping_patience, config.min_fitness_delta,
+                             config.min_diversity, config.max_restarts)
+
+    @timed_stage('optimize_position', by_position=True)
+    def optimize_position(self, position, island=0, progress=None, should_stop=None, warm_start=False):
+        # 回傳 (最佳個體, 適應度, 執行資訊)；執行資訊的 history 為每代的 (最佳, 平均, 多樣性)
+        # warm_start 時從 position_genomes 中目前的策略開始，適合 ingest 新牌局後繼續訓練
+        start = time.perf_counter()
+        config = self.config
+        rng = self.position_rng(position, island)
+        factors = self.fitness_factors_by_position[position]
+        if warm_start:
+            population = self.warm_start_population_for_position(position, config.initial_population_size, rng)
         else:
-            if hand_value < 5:
-                action_values.pop('all-in', None)
-
-            for action in action_values:
-                action_values[action] *= (pot_size / (pot_size + remaining_funds))
-
-            recommended_action = max(action_values, key=action_values.get)
-
-        if recommended_action == 'raise':
-            average_raise_size = sum(raise_sizes) / len(raise_sizes) if raise_sizes else big_blind_amount
-            if remaining_funds < average_raise_size:
-                recommended_action = 'call' if remaining_funds >= big_blind_amount else 'fold'
-            return recommended_action, int(average_raise_size)
+            population = self.initialize_population_for_position(position, config.initial_population_size, rng)
+        buffers = self.generation_buffers(config.initial_population_size)
+        controller = self.run_controller()
+        cache = FitnessCache(self.fitness_cache_size) if self.fitness_cache_size else None
+        hashes = genome_hashes(population) if cache else None
+
+        def evaluate(rows):
+            return self.evaluate_population_fitness(rows, factors)
+
+        while True:
+            fitness_scores = cache.evaluate(population, hashes, evaluate) if cache else evaluate(population)
+            decision = controller.record(population, fitness_scores)
+            if progress:
+                progress(position, controller.generation, controller.best_fitness)
+            # 取消時回傳到目前為止最好的個體
+            if should_stop and should_stop():
+                controller.stop_reason = 'cancelled'
+                break
+            if decision == STOP:
+                break
+            elites = controller.elite_indices(fitness_scores)
+            if decision == RESTART:
+                population, hashes = self.restart_population_for_position(population, position, rng, hashes, elites)
+            else:
+                population, hashes = self.create_new_population_for_position(population, position, fitness_scores, config.mutation_rate,
+                                                                             config.crossover_rate, rng, hashes, buffers.next(), elites)
+        # 緩衝區會被重用，回傳唯讀的複本
+        best_genome = controller.best_genome
+        best_genome.setflags(write=False)
+        info = controller.info()
+        info['fitness_cache'] = cache.stats() if cache else None
+        info['seconds'] = time.perf_counter() - start
+        return best_genome, controller.best_fitness, info
+
+    def shared_tables(self):
+        # 平行 worker 只需要這些唯讀表格
+        return {
+            'seed_entropy': self.seed_entropy,
+            'fitness_factors_by_position': self.fitness_factors_by_position,
+            'hand_value_counts_by_position': self.hand_value_counts_by_position,
+            'fitness_cache_size': self.fitness_cache_size,
+            'position_genomes': self.position_genomes,
+            'config': self.config,
+        }
 
-        return recommended_action
+    def set_position_result(self, position, island_results, position_ready=None):
+        # 多個島嶼時取適應度最高者，同分取編號最小的島嶼，結果與完成順序無關
+        best_island = max(sorted(island_results), key=lambda island: island_results[island][1])
+        best_genome = island_results[best_island][0]
+        self.position_run_info[position] = {island: result[2] for island, result in island_results.items()}
+        self.set_position_genome(position, best_genome)
+        self.compile_decision_table()
+        if position_ready:
+            position_ready(position)
+
+    @timed_stage('optimize_strategy')
+    def optimize_strategy(self, workers=1, islands=1, progress=None, position_ready=None, should_stop=None, warm_start=False):
+        # progress(position, generation, best_fitness) 回報進度；position_ready(position) 在該位置策略可用時呼叫
+        # should_stop() 回傳 True 時停止，已完成（或中途停止）的位置結果仍會保留
+        # warm_start 時各位置從目前的策略繼續訓練
+        results = {position: {} for position in POSITIONS}
+        if workers <= 1:
+            for position in POSITIONS:
+                if should_stop and should_stop():
+                    break
+                print(f"Optimizing strategy for {position}")
+                for island in range(islands):
+                    if island and should_stop and should_stop():
+                        break
+                    results[position][island] = self.optimize_position(position, island, progress, should_stop, warm_start)
+                self.set_position_result(position, results[position], position_ready)
+        else:
+            tasks = [(position, island) for position in POSITIONS for island in range(islands)]
+            ready = set()
+            context = multiprocessing.get_context()
+            stop_event = context.Event()
+            progress_queue = context.Queue() if progress else None
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(self.shared_tables(), stop_event, progress_queue)) as executor:
+                futures = {executor.submit(_optimize_position_task, position, island, warm_start): (position, island) for position, island in tasks}
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                    if progress:
+                        _forward_progress(progress_queue, progress)
+                    if should_stop and should_stop() and not stop_event.is_set():
+                        # 執行中的 worker 在下一個世代停止並回傳目前最好的個體，尚未開始的工作直接取消
+                        stop_event.set()
+                        for future in pending:
+                            future.cancel()
+                    for future in done:
+                        if future.cancelled():
+                            continue
+                        position, island = futures[future]
+                        results[position][island] = future.result()
+                        if self.stage_timer:
+                            # worker 中的時間由執行資訊帶回
+                            self.stage_timer.add('optimize_position', results[position][island][2]['seconds'], position)
+                        print(f"Optimized strategy for {position}")
+                        if progress:
+                            progress(position, results[position][island][2]['generations'], results[position][island][1])
+                        if len(results[position]) == islands:
+                            self.set_position_result(position, results[position], position_ready)
+                            ready.add(position)
+
+            for position in POSITIONS:
+                if results[position] and position not in ready:
+                    self.set_position_result(position, results[position], position_ready)
+
+    @timed_stage('compile_decision_table')
+    def compile_decision_table(self):
+        return super().compile_decision_table()
@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+from card_classes import preflop_category_one
+from decision_table import (NUM_CATEGORIES, NUM_STACK_BUCKETS, STACK_DEEP, STACK_MINIMUM, STACK_NEGATIVE_POT,
+                            STACK_NO_POT, STACK_SHORT, DecisionTable)
+from hand_evaluator import CARD_INDEX, card_to_int, evaluate, hand_category
+from strategy_config import ACTIONS, POSITIONS, StrategyConfig
+
+# 基因陣列的欄位：(動作索引, 手牌價值)
+GENE_ACTION = 0
+GENE_HAND_VALUE = 1
+
+
+def genome_to_strategy(genome, position):
+    return [{'position': position, 'action': ACTIONS[action], 'hand_value': int(hand_value)} for action, hand_value in genome]
+
+
+def strategy_to_genome(strategy):
+    return np.array([(ACTIONS.index(gene['action']), gene['hand_value']) for gene in strategy], dtype=np.int8)
+
+
+class StrategyPolicy:
+    # 推薦只需要各位置的基因、期望值中的加注大小與盲注；不依賴訓練、資料讀取與 pandas
+    # StrategyOptimizer 繼承這個類別，載入訓練結果時只建立 StrategyPolicy
+    def __init__(self, config=None):
+        self.config = config if config is not None else StrategyConfig()
+        self.position_genomes = {}
+        self.position_strategies = {}
+        self.expected_values_by_position = {}
+        self.decision_table = None
+
+    def set_position_genome(self, position, genome):
+        self.position_genomes[position] = genome
+        self.position_strategies[position] = genome_to_strategy(genome, position)
+
+    def calculate_hand_value(self, cards):
+        return hand_category(evaluate([card_to_int(card) for card in cards]))
+
+    def compile_decision_table(self):
+        # 將各位置策略展開成 (位置, 牌型類別, 籌碼分桶) 的查表，推薦時只需查表
+        fold, call, raise_, all_in = (ACTIONS.index(action) for action in ('fold', 'call', 'raise', 'all-in'))
+        categories = np.arange(NUM_CATEGORIES)
+        actions = np.full((len(POSITIONS), NUM_CATEGORIES, NUM_STACK_BUCKETS), fold, dtype=np.int8)
+        big_blind = self.config.big_blind_amount
+        raise_sizes = np.full((len(POSITIONS), NUM_CATEGORIES), float(big_blind))
+
+        for p, position in enumerate(POSITIONS):
+            if position not in self.position_genomes:
+                continue
+            genome = self.position_genomes[position].astype(np.intp)
+            counts = np.zeros((NUM_CATEGORIES, len(ACTIONS)))
+            np.add.at(counts, (genome[:, GENE_HAND_VALUE], genome[:, GENE_ACTION]), 1)
+            raise_sizes[p] = np.where(counts[:, raise_] > 0, self.expected_values_by_position[position]['raise_size'], big_blind)
+
+            # 牌型小於同花時不考慮全下；同分時取 ACTIONS 中較前面的動作
+            weak = categories < 5
+            deep = counts.copy()
+            deep[weak, all_in] = -np.inf
+            negative = counts.copy()
+            negative[weak, all_in] = np.inf
+
+            # 各分桶對應原本 recommend_action 的分支
+            actions[p, :, STACK_SHORT] = np.where(categories > 3, all_in, fold)
+            actions[p, :, STACK_MINIMUM] = np.where(categories > 2, all_in, fold)
+            actions[p, :, STACK_DEEP] = deep.argmax(axis=1)
+            actions[p, :, STACK_NO_POT] = fold
+            actions[p, :, STACK_NEGATIVE_POT] = negative.argmin(axis=1)
+
+        self.decision_table = DecisionTable(actions, raise_sizes, ACTIONS, self.config.small_blind_amount, big_blind)
+        return self.decision_table
+
+    def get_best_strategies(self):
+        return self.position_strategies
+
+    def recommend_action(self, position, hand, community_cards, initial_funds, remaining_funds, pot_size):
+        if position not in self.position_strategies:
+            raise ValueError(f"Position {position} not found in strategies.")
+
+        initial_funds = float(initial_funds)
+        remaining_funds = float(remaining_funds)
+        pot_size = float(pot_size)
+        if not all(math.isfinite(value) for value in (initial_funds, remaining_funds, pot_size)):
+            raise ValueError("Funds and pot size must be finite numbers")
+
+        # 與批次推薦相同的解碼方式，格式錯誤的牌直接回報錯誤而不是略過
+        hand = [CARD_INDEX[card] if card in CARD_INDEX else card_to_int(card) for card in hand]
+        community_cards = [CARD_INDEX[card] if card in CARD_INDEX else card_to_int(card) for card in community_cards]
+        if len(hand) == 2 and not community_cards:
+            # 翻牌前以起手牌類別查表，不需評估
+            hand_value = preflop_category_one(hand[0], hand[1])
+        else:
+            hand_value = hand_category(evaluate(hand + community_cards))
+
+        table = self.decision_table
+        action, raise_size = table.lookup_one(POSITIONS.index(position), hand_value, remaining_funds, pot_size)
+        recommended_action = ACTIONS[action]
+        if raise_size:
+            return recommended_action, int(raise_size)
+
+        return recommended_action
+
+    def recommend_actions(self, positions, cards, remaining_funds, pot_sizes):
+        # 批次推薦：positions 為位置索引或名稱，cards 為 (N, 7) 牌編碼，未發出的公共牌以 -1 填在後面
+        # 回傳動作索引陣列與加注大小陣列（非加注時為 0）
+        positions = np.asarray(positions)
+        if positions.dtype.kind in 'US':
+            positions = np.array([POSITIONS.index(position) for position in positions])
+        table = self.decision_table
+        hand_values = table.hand_values(cards)
+        actions, raise_sizes = table.lookup(positions, hand_values, remaining_funds, pot_sizes)
+        return actions, raise_sizes.astype(int)
@@ -0,0 +1,184 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from equity import EQUITY_SAMPLES
+from strategy_config import EV_MODELS, POSITIONS, StrategyConfig
+from strategy_policy import StrategyPolicy
+
+# 訓練結果檔案格式版本，格式或期望值的計算方式變動時遞增以讓舊快取失效
+ARTIFACT_VERSION = 3
+DEFAULT_CACHE_DIR = 'strategy_cache'
+_HASH_BLOCK_SIZE = 1 << 20
+_HASH_INDEX = 'dataset-hashes.json'
+
+
+def hyperparameters(seed=None, islands=1, ev_model='legacy', equity_samples=EQUITY_SAMPLES, config=None):
+    config = config if config is not None else StrategyConfig()
+    return {
+        **config.as_dict(),
+        'seed': seed,
+        'islands': islands,
+        'ev_model': ev_model,
+        'equity_samples': equity_samples if ev_model != 'legacy' else None,
+    }
+
+
+def dataset_hash(path, cache_dir=DEFAULT_CACHE_DIR):
+    # 以 (大小, 修改時間) 快取雜湊值，資料檔沒變時不必重新讀取整個檔案
+    stat = os.stat(path)
+    index_path = os.path.join(cache_dir, _HASH_INDEX)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    entry = index.get(os.path.abspath(path))
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    index[os.path.abspath(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    return digest.hexdigest()
+
+
+def artifact_key(data_hash, params):
+    payload = json.dumps({'version': ARTIFACT_VERSION, 'dataset': data_hash, 'hyperparameters': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def artifact_path(key, cache_dir=DEFAULT_CACHE_DIR):
+    return os.path.join(cache_dir, f'strategy-{key[:16]}.npz')
+
+
+def save_strategy(optimizer, path, key=None, params=None):
+    metadata = {
+        'version': ARTIFACT_VERSION,
+        'key': key,
+        'hyperparameters': params,
+        # 決策表依賴的設定（盲注、起始籌碼、加注大小等）與快取鍵分開保存，沒有傳入 params 時也能還原
+        'config': optimizer.config.as_dict(),
+        'positions': POSITIONS,
+        'expected_values_by_position': {
+            position: {
+                action: ({str(num_cards): float(value) for num_cards, value in values.items()} if isinstance(values, dict) else float(values))
+                for action, values in optimizer.expected_values_by_position[position].items()
+            }
+            for position in POSITIONS
+        },
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # 先寫入暫存檔再改名，避免中斷時留下損壞的快取
+    temp_path = f'{path}.tmp.npz'
+    np.savez(temp_path, metadata=np.array(json.dumps(metadata)),
+             genomes=np.stack([optimizer.position_genomes[position] for position in POSITIONS]))
+    os.replace(temp_path, path)
+
+
+def load_strategy(path, key=None):
+    with np.load(path, allow_pickle=False) as artifact:
+        metadata = json.loads(str(artifact['metadata']))
+        genomes = artifact['genomes']
+    if metadata['version'] != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported strategy artifact version {metadata['version']}: {path}")
+    if key is not None and metadata['key'] != key:
+        raise ValueError(f"Strategy artifact {path} does not match the dataset or hyperparameters")
+
+    # 只需推薦時不載入訓練模組；以訓練時的設定重建，決策表的盲注與加注大小才會一致
+    # 較早寫入、沒有 config 欄位的檔案改由快取鍵的超參數還原
+    policy = StrategyPolicy(StrategyConfig.from_dict(metadata.get('config') or metadata['hyperparameters'] or {}))
+    policy.expected_values_by_position = {
+        position: {
+            action: ({int(num_cards): value for num_cards, value in values.items()} if isinstance(values, dict) else values)
+            for action, values in metadata['expected_values_by_position'][position].items()
+        }
+        for position in metadata['positions']
+    }
+    for position, genome in zip(metadata['positions'], genomes):
+        policy.set_position_genome(position, genome)
+    policy.compile_decision_table()
+    return policy
+
+
+def load_config(path=None):
+    # 沒有指定檔案時使用預設設定；檔案中未列出的欄位保留預設值
+    if path is None:
+        return StrategyConfig()
+    with open(path) as f:
+        values = json.load(f)
+    unknown = set(values) - set(StrategyConfig().as_dict())
+    if unknown:
+        raise ValueError(f"Unknown config fields in {path}: {', '.join(sorted(unknown))}")
+    return StrategyConfig(**values)
+
+
+def strategy_key(data_path, params, cache_dir=DEFAULT_CACHE_DIR):
+    return artifact_key(dataset_hash(data_path, cache_dir), params)
+
+
+def load_cached_strategy(data_path, seed=None, islands=1, cache_dir=DEFAULT_CACHE_DIR, ev_model='legacy', equity_samples=EQUITY_SAMPLES,
+                         config=None):
+    key = strategy_key(data_path, hyperparameters(seed, islands, ev_model, equity_samples, config), cache_dir)
+    path = artifact_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return load_strategy(path, key)
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Ignoring strategy artifact {path}: {e}")
+        return None
+
+
+def train_strategy(optimizer, workers=1, islands=1, cache_dir=DEFAULT_CACHE_DIR,
+                   progress=None, position_ready=None, should_stop=None):
+    # 只有所有位置都訓練完成時才寫入快取，取消後的部分結果只留在記憶體中
+    params = hyperparameters(optimizer.seed, islands, optimizer.ev_model, optimizer.equity_samples, optimizer.config)
+    key = strategy_key(optimizer.file_path, params, cache_dir)
+    optimizer.optimize_strategy(workers, islands, progress, position_ready, should_stop)
+    if (should_stop and should_stop()) or len(optimizer.position_genomes) < len(POSITIONS):
+        return None
+    path = artifact_path(key, cache_dir)
+    save_strategy(optimizer, path, key, params)
+    return path
+
+
+def load_or_train(data_path, seed=None, workers=1, islands=1, cache_dir=DEFAULT_CACHE_DIR, ev_model='legacy', equity_samples=EQUITY_SAMPLES,
+                  config=None):
+    optimizer = load_cached_strategy(data_path, seed, islands, cache_dir, ev_model, equity_samples, config)
+    if optimizer is None:
+        from strategy_optimizer import StrategyOptimizer
+        optimizer = StrategyOptimizer(data_path, seed, ev_model, equity_samples, workers, config=config)
+        train_strategy(optimizer, workers, islands, cache_dir)
+    return optimizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train position strategies offline and write the strategy artifact.")
+    parser.add_argument('data_path')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--islands', type=int, default=1)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--ev-model', choices=EV_MODELS, default='legacy')
+    parser.add_argument('--equity-samples', type=int, default=EQUITY_SAMPLES)
+    parser.add_argument('--config', help="JSON file of StrategyConfig values overriding the defaults")
+    args = parser.parse_args()
+
+    from strategy_optimizer import StrategyOptimizer
+    start = time.perf_counter()
+    optimizer = StrategyOptimizer(args.data_path, args.seed, args.ev_model, args.equity_samples, args.workers, config=load_config(args.config))
+    path = train_strategy(optimizer, args.workers, args.islands, args.cache_dir)
+    print(f"Wrote {path} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from equity import EQUITY_SAMPLES
+from run_controller import HISTORY_BEST
+from strategy_optimizer import EV_MODELS, POSITIONS, StrategyOptimizer
+from strategy_store import load_config
+
+# 每個位置的適應度曲線最多保留的點數
+CURVE_POINTS = 20
+
+_sweep_optimizer = None
+_sweep_configs = {}
+
+
+def config_grid(base, values):
+    # values: {欄位: [候選值, ...]}；回傳所有組合（笛卡兒積）
+    names = list(values)
+    return [base.replace(**dict(zip(names, combination))) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def random_configs(base, space, num_configs, seed=None):
+    # space: {欄位: (下限, 上限)}；整數欄位在閉區間內均勻抽樣，其餘欄位取均勻分布的實數
+    rng = np.random.default_rng(seed)
+    defaults = base.as_dict()
+    configs = []
+    for _ in range(num_configs):
+        changes = {}
+        for name, (low, high) in space.items():
+            if isinstance(defaults[name], int):
+                changes[name] = int(rng.integers(low, high, endpoint=True))
+            else:
+                changes[name] = float(rng.uniform(low, high))
+        configs.append(base.replace(**changes))
+    return configs
+
+
+def _init_worker(optimizer):
+    # fork 時 optimizer 直接繼承自父行程，不需重新讀取資料檔或序列化
+    global _sweep_optimizer
+    _sweep_optimizer = optimizer
+
+
+def _position_task(index, config, position):
+    # 同一個 worker 中同一組設定的表格只計算一次
+    if index not in _sweep_configs:
+        _sweep_configs[index] = _sweep_optimizer.with_config(config)
+    return position_result(_sweep_configs[index], position)
+
+
+def position_result(optimizer, position):
+    _, fitness, info = optimizer.optimize_position(position)
+    best = info['history'][:, HISTORY_BEST]
+    # 假設每個世代的時間相同，把最佳適應度的歷程換算成 (秒, 適應度) 的曲線
+    points = np.unique(np.linspace(0, len(best) - 1, min(CURVE_POINTS, len(best))).astype(int))
+    seconds_per_generation = info['seconds'] / len(best)
+    return {
+        'fitness': fitness,
+        'seconds': info['seconds'],
+        'generations': info['generations'],
+        'restarts': info['restarts'],
+        'stop_reason': info['stop_reason'],
+        'curve': [[float((point + 1) * seconds_per_generation), float(best[:point + 1].max())] for point in points],
+    }
+
+
+def summarize(config, positions):
+    # 適應度是基因的總和，不同 genes_per_individual 之間以每個基因的平均比較
+    fitness = sum(result['fitness'] for result in positions.values())
+    return {
+        'config': config.as_dict(),
+        'fitness': fitness,
+        'fitness_per_gene': fitness / (len(positions) * config.genes_per_individual),
+        'seconds': sum(result['seconds'] for result in positions.values()),
+        'generations': sum(result['generations'] for result in positions.values()),
+        'positions': positions,
+    }
+
+
+def _pool_context():
+    # 有 fork 時以 fork 建立 worker，已 ingest 的統計量以寫入時複製的方式共用
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def run_sweep(optimizer, configs, workers=1, progress=None):
+    # 所有設定共用 optimizer 已 ingest 的統計量與亂數種子，結果只反映設定的差異
+    # 每個 (設定, 位置) 是一個工作；progress(index, position, result) 在每個工作完成時呼叫
+    positions = [{} for _ in configs]
+    if workers <= 1:
+        for index, config in enumerate(configs):
+            configured = optimizer.with_config(config)
+            for position in POSITIONS:
+                positions[index][position] = position_result(configured, position)
+                if progress:
+                    progress(index, position, positions[index][position])
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=_init_worker, initargs=(optimizer,)) as executor:
+            futures = {
+                executor.submit(_position_task, index, config, position): (index, position)
+                for index, config in enumerate(configs) for position in POSITIONS
+            }
+            for future in as_completed(futures):
+                index, position = futures[future]
+                positions[index][position] = future.result()
+                if progress:
+                    progress(index, position, positions[index][position])
+    return [summarize(config, {position: results[position] for position in POSITIONS}) for config, results in zip(configs, positions)]
+
+
+def parse_settings(items, defaults, separator):
+    # 'name=value' 形式的參數；separator 分隔多個值（',' 為網格的候選值，':' 為隨機抽樣的上下限）
+    settings = {}
+    for item in items:
+        name, _, text = item.partition('=')
+        if name not in defaults:
+            raise ValueError(f"Unknown config field {name!r}, expected one of {', '.join(defaults)}")
+        settings[name] = [type(defaults[name])(value) for value in text.split(separator)]
+    return settings
+
+
+def print_results(results, base):
+    # 只列出與 base 不同的欄位
+    print(f"{'fitness/gene':>13} {'seconds':>9} {'generations':>12}  config")
+    defaults = base.as_dict()
+    for result in sorted(results, key=lambda result: result['fitness_per_gene'], reverse=True):
+        changes = ', '.join(f'{name}={value}' for name, value in result['config'].items() if value != defaults[name]) or 'defaults'
+        print(f"{result['fitness_per_gene']:>13.3f} {result['seconds']:>9.2f} {result['generations']:>12}  {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train every position under several hyperparameter configs and compare fitness against wall time.")
+    parser.add_argument('data_path', nargs='?', default='Texas_Holdem/poker_games_detailed2.csv')
+    parser.add_argument('--grid', nargs='+', default=[], metavar='NAME=V1,V2', help="Values to try for a config field; fields are combined as a grid")
+    parser.add_argument('--random', type=int, default=0, metavar='N', help="Sample N configs from --space instead of a grid")
+    parser.add_argument('--space', nargs='+', default=[], metavar='NAME=LOW:HIGH', help="Sampling range of a config field for --random")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--sample-seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--ev-model', choices=EV_MODELS, default='legacy')
+    parser.add_argument('--equity-samples', type=int, default=EQUITY_SAMPLES)
+    parser.add_argument('--output', help="Write the full results, including fitness curves, as JSON")
+    parser.add_argument('--config', help="JSON file of StrategyConfig values used as the base of the grid or random search")
+    args = parser.parse_args()
+
+    base = load_config(args.config)
+    defaults = base.as_dict()
+    if args.random:
+        space = {name: tuple(bounds) for name, bounds in parse_settings(args.space, defaults, ':').items()}
+        if any(len(bounds) != 2 for bounds in space.values()):
+            parser.error("--space expects NAME=LOW:HIGH")
+        configs = random_configs(base, space, args.random, args.sample_seed)
+    else:
+        configs = config_grid(base, parse_settings(args.grid, defaults, ','))
+
+    # 資料只讀取與 ingest 一次
+    optimizer = StrategyOptimizer(args.data_path, args.seed, args.ev_model, args.equity_samples, args.workers, config=base)
+    print(f"Sweeping {len(configs)} configs over {optimizer.num_games:,} games")
+    start = time.perf_counter()
+
+    def progress(index, position, result):
+        print(f"config {index + 1}/{len(configs)} {position}: fitness {result['fitness']:.1f} in {result['seconds']:.2f} s")
+
+    results = run_sweep(optimizer, configs, args.workers, progress)
+    print_results(results, base)
+    print(f"Swept {len(configs)} configs in {time.perf_counter() - start:.1f} s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()